@@ -0,0 +1,413 @@
+# artifact_store.py
+# Keyed store for generated results (CSV tables, PDFs, job records).
+#
+# Every artifact is written to a shared directory so any gunicorn worker can
+# serve it, and each one belongs to the browser session that created it.
+# Recently used small blobs are also kept in memory up to a byte budget;
+# anything above the spill threshold is served straight from disk. Tables are
+# written row by row as a sequence of pickled row chunks, with the chunk
+# offsets in their metadata, so they are built, paged and downloaded without
+# ever being loaded whole; worker processes can write parts of a table that
+# are then appended to it as they are. Artifacts expire after a TTL.
+import os
+import json
+import stat
+import time
+import pickle
+import shutil
+import secrets
+import tempfile
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+STORE_DIR = os.getenv("ARTIFACT_STORE_DIR", os.path.join(tempfile.gettempdir(), "boomi-artifacts"))
+ARTIFACT_TTL = int(os.getenv("ARTIFACT_TTL", "3600"))
+MEMORY_BUDGET = int(os.getenv("ARTIFACT_MEMORY_MB", "64")) * 1024 * 1024
+SPILL_THRESHOLD = int(os.getenv("ARTIFACT_SPILL_KB", "1024")) * 1024
+# Rows per pickled chunk of a table artifact
+TABLE_CHUNK_ROWS = 1000
+
+# How often (seconds) put() sweeps the directory for expired artifacts
+_SWEEP_INTERVAL = 60
+
+
+# The store is unpickled from and holds the Flask secret, so a directory that
+# already exists (say one planted in a shared /tmp) is only used when it is ours
+# and closed to everyone else.
+def ensure_private_dir(directory):
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError(f"Artifact store is not a directory: {directory}")
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise RuntimeError(f"Artifact store {directory} is owned by another user")
+    if st.st_mode & 0o077:
+        raise RuntimeError(f"Artifact store {directory} is accessible to other users "
+                           f"(mode {stat.S_IMODE(st.st_mode):o}), expected 700")
+
+
+class RowChunks:
+    """
+    Appends rows to an open binary file as pickled chunks of chunk_rows rows and
+    keeps where each chunk starts: its byte offset and its first row. A worker
+    process writes a table part with one and returns its layout() for
+    TableWriter.append_part.
+    """
+
+    def __init__(self, file, chunk_rows=TABLE_CHUNK_ROWS):
+        self.file = file
+        self.chunk_rows = chunk_rows
+        self.offsets = []
+        self.starts = []
+        self.row_count = 0
+        self._chunk = []
+
+    def append(self, row):
+        self._chunk.append(row)
+        if len(self._chunk) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if self._chunk:
+            self.offsets.append(self.file.tell())
+            self.starts.append(self.row_count)
+            pickle.dump(self._chunk, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.row_count += len(self._chunk)
+            self._chunk = []
+
+    def layout(self):
+        self.flush()
+        return self.offsets, self.starts, self.row_count
+
+    def append_file(self, path, layout):
+        """Copy the chunks another RowChunks wrote to path onto the end of this file."""
+        self.flush()
+        offsets, starts, row_count = layout
+        base = self.file.tell()
+        with open(path, "rb") as part:
+            shutil.copyfileobj(part, self.file, 1024 * 1024)
+        self.offsets.extend(base + offset for offset in offsets)
+        self.starts.extend(self.row_count + start for start in starts)
+        self.row_count += row_count
+
+
+def iter_part_rows(path, layout):
+    """The rows RowChunks wrote to path, read back chunk by chunk."""
+    with open(path, "rb") as f:
+        for _ in layout[0]:
+            yield from pickle.load(f)
+
+
+class TableWriter:
+    """
+    Builds a table artifact a chunk of rows at a time. Nothing is visible until
+    close(), which returns the artifact id; leaving the with block without
+    closing discards the partial table.
+    """
+
+    def __init__(self, store, owner, header=None, artifact_id=None, chunk_rows=TABLE_CHUNK_ROWS, **meta):
+        self.store = store
+        self.owner = owner
+        self.header = header
+        self.artifact_id = artifact_id or secrets.token_urlsafe(16)
+        self.chunk_rows = chunk_rows
+        self.meta = meta
+        self._path = store._path(self.artifact_id, "data")
+        self._tmp_path = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._chunks = RowChunks(self._file, chunk_rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            self.abort()
+
+    @property
+    def row_count(self):
+        return self._chunks.row_count
+
+    def append(self, row):
+        self._chunks.append(row)
+
+    def extend(self, rows):
+        for row in rows:
+            self._chunks.append(row)
+
+    def append_part(self, path, layout):
+        """Append the rows a RowChunks wrote to path, copying its chunks without unpickling them."""
+        self._chunks.append_file(path, layout)
+
+    def close(self, header=None):
+        """Publish the table, optionally setting its header now, and return its id."""
+        self._chunks.flush()
+        size = self._file.tell()
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self._path)
+
+        meta = dict(self.meta, id=self.artifact_id, owner=self.owner, kind="table", size=size,
+                    created=time.time(), header=header or self.header or [], rows=self.row_count,
+                    chunk_rows=self.chunk_rows, offsets=self._chunks.offsets, starts=self._chunks.starts)
+        self.store._write(self.store._path(self.artifact_id, "meta"), json.dumps(meta).encode("utf-8"))
+        return self.artifact_id
+
+    def abort(self):
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self._tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class StoredTable:
+    """Read side of a table artifact: its header and row count, and its rows read chunk by chunk."""
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.header = meta["header"]
+        self.row_count = meta["rows"]
+        self.chunk_rows = meta["chunk_rows"]
+        self.offsets = meta["offsets"]
+        # Chunks appended from worker parts can be shorter than chunk_rows
+        self.starts = meta.get("starts") or [i * self.chunk_rows for i in range(len(self.offsets))]
+
+    def iter_chunks(self):
+        with open(self.path, "rb") as f:
+            for _ in self.offsets:
+                yield pickle.load(f)
+
+    def iter_rows(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def chunk(self, index):
+        """The rows of chunk index, the first of which is row starts[index]."""
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[index])
+            return pickle.load(f)
+
+    def locate(self, row):
+        """(chunk index, position in that chunk) of a row."""
+        index = bisect_right(self.starts, row) - 1
+        return index, row - self.starts[index]
+
+
+class ArtifactStore:
+    def __init__(self, directory=STORE_DIR, ttl=ARTIFACT_TTL, memory_budget=MEMORY_BUDGET,
+                 spill_threshold=SPILL_THRESHOLD):
+        self.directory = directory
+        self.ttl = ttl
+        self.memory_budget = memory_budget
+        self.spill_threshold = spill_threshold
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        ensure_private_dir(self.directory)
+
+    # ---- paths and atomic writes ----
+
+    def _path(self, artifact_id, suffix):
+        if not artifact_id.replace("-", "").replace("_", "").isalnum():
+            raise KeyError(artifact_id)
+        return os.path.join(self.directory, f"{artifact_id}.{suffix}")
+
+    def _write(self, path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # ---- in-memory hot copies ----
+
+    def _remember(self, artifact_id, value, size):
+        if size > self.spill_threshold or size > self.memory_budget:
+            return
+        with self._lock:
+            if artifact_id in self._memory:
+                self._memory_bytes -= self._memory.pop(artifact_id)[1]
+            self._memory[artifact_id] = (value, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.memory_budget:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+
+    def _recall(self, artifact_id):
+        with self._lock:
+            entry = self._memory.get(artifact_id)
+            if entry is None:
+                return None
+            self._memory.move_to_end(artifact_id)
+            return entry[0]
+
+    def _forget(self, artifact_id):
+        with self._lock:
+            entry = self._memory.pop(artifact_id, None)
+            if entry is not None:
+                self._memory_bytes -= entry[1]
+
+    # ---- expiry ----
+
+    def _sweep(self):
+        now = time.time()
+        if now - self._last_sweep < _SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        cutoff = now - self.ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".meta") and entry.stat().st_mtime < cutoff:
+                    self.delete(entry.name[:-len(".meta")])
+            except (OSError, KeyError):
+                pass
+
+    def delete(self, artifact_id):
+        self._forget(artifact_id)
+        for suffix in ("meta", "data"):
+            try:
+                os.remove(self._path(artifact_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    # ---- public API ----
+
+    def put(self, data, owner, kind="blob", artifact_id=None, **meta):
+        """
+        Store an artifact and return its id. kind "blob" takes bytes/str, "table"
+        takes {"header": [...], "rows": [[...], ...]}, "record" takes any JSON-able value.
+        Extra keyword arguments (name, mimetype, ...) are kept as metadata.
+        """
+        if kind == "table":
+            with self.table_writer(owner, data["header"], artifact_id, **meta) as writer:
+                writer.extend(data["rows"])
+                return writer.close()
+
+        self._sweep()
+        artifact_id = artifact_id or secrets.token_urlsafe(16)
+        if kind == "blob":
+            payload = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        else:
+            payload = json.dumps(data).encode("utf-8")
+
+        meta.update(id=artifact_id, owner=owner, kind=kind, size=len(payload), created=time.time())
+        self._write(self._path(artifact_id, "data"), payload)
+        self._write(self._path(artifact_id, "meta"), json.dumps(meta).encode("utf-8"))
+        # Records can be rewritten under the same id (job progress), so only
+        # immutable blobs get an in-memory copy
+        if kind == "blob":
+            self._remember(artifact_id, (meta, payload), len(payload))
+        return artifact_id
+
+    def table_writer(self, owner, header=None, artifact_id=None, **meta):
+        """A TableWriter for a new table artifact; rows are appended as lists of strings."""
+        self._sweep()
+        return TableWriter(self, owner, header, artifact_id, **meta)
+
+    def put_file(self, fileobj, owner, artifact_id=None, chunk_size=1024 * 1024, **meta):
+        """Store a binary stream as a blob, copying it in chunks so it is never held in memory."""
+        self._sweep()
+        artifact_id = artifact_id or secrets.token_urlsafe(16)
+        path = self._path(artifact_id, "data")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        size = 0
+        with open(tmp_path, "wb") as f:
+            while True:
+                chunk = fileobj.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, path)
+
+        meta.update(id=artifact_id, owner=owner, kind="blob", size=size, created=time.time())
+        self._write(self._path(artifact_id, "meta"), json.dumps(meta).encode("utf-8"))
+        return artifact_id
+
+    def meta(self, artifact_id, owner=None):
+        """Metadata of a live artifact visible to owner, or None."""
+        cached = self._recall(artifact_id)
+        if cached is not None:
+            meta = cached[0]
+        else:
+            try:
+                with open(self._path(artifact_id, "meta"), "rb") as f:
+                    meta = json.loads(f.read())
+            except (OSError, KeyError, ValueError):
+                return None
+        if time.time() - meta["created"] > self.ttl:
+            return None
+        if owner is not None and meta["owner"] != owner:
+            return None
+        return meta
+
+    def get(self, artifact_id, owner=None):
+        """
+        The stored value (bytes, table dict or record) if visible to owner, else
+        None. A table is loaded whole; use table() to read it chunk by chunk.
+        """
+        meta = self.meta(artifact_id, owner)
+        if meta is None:
+            return None
+        if meta["kind"] == "table":
+            table = StoredTable(self._path(artifact_id, "data"), meta)
+            try:
+                return {"header": table.header, "rows": list(table.iter_rows())}
+            except OSError:
+                return None
+        cached = self._recall(artifact_id)
+        if cached is not None:
+            return cached[1]
+        try:
+            with open(self._path(artifact_id, "data"), "rb") as f:
+                payload = f.read()
+        except OSError:
+            return None
+        if meta["kind"] != "blob":
+            return json.loads(payload)
+        self._remember(artifact_id, (meta, payload), len(payload))
+        return payload
+
+    def table(self, artifact_id, owner=None):
+        """A StoredTable for a table artifact visible to owner, else None."""
+        meta = self.meta(artifact_id, owner)
+        if meta is None or meta["kind"] != "table":
+            return None
+        return StoredTable(self._path(artifact_id, "data"), meta)
+
+    def path(self, artifact_id, owner=None):
+        """On-disk location of a blob artifact, for streaming large files without loading them."""
+        if self.meta(artifact_id, owner) is None:
+            return None
+        return self._path(artifact_id, "data")
+
+
+# The Flask secret key has to be identical in every worker so session-owned
+# artifacts resolve anywhere; without FLASK_SECRET_KEY one is generated once
+# and shared through the store directory.
+def shared_secret_key(store_dir=STORE_DIR):
+    key = os.getenv("FLASK_SECRET_KEY")
+    if key:
+        return key
+    ensure_private_dir(store_dir)
+    path = os.path.join(store_dir, "secret_key")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    except FileExistsError:
+        pass
+    # Another worker may have created the file but not written it yet
+    for _ in range(50):
+        with open(path) as f:
+            key = f.read().strip()
+        if key:
+            return key
+        time.sleep(0.02)
+    raise RuntimeError(f"Empty secret key file: {path}")
+
+
+artifact_store = ArtifactStore()
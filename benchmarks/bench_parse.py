@@ -0,0 +1,86 @@
+# benchmarks/bench_parse.py
+# Compares the old xmltodict round trip with the streaming component_xml reader.
+#
+#   python benchmarks/bench_parse.py                      # synthetic exports (benchmarks/synthetic.py)
+#   python benchmarks/bench_parse.py --shapes 500 5000    # pick the sizes
+#   python benchmarks/bench_parse.py export1.xml ...      # real exports
+import io
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+import xmltodict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import synthetic_component
+from extract import parse_process_xml_to_metadata
+
+# Parsing cost is dominated by connector configurations and embedded scripts
+PARSE_SHAPE_MIX = {"connectoraction": 2, "dataprocess": 1}
+
+
+# The pre-streaming path: whole-document dict, JSON round trip, then the shape walk
+def legacy_parse(xml_data):
+    json_data = json.loads(json.dumps(xmltodict.parse(xml_data)))
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=["ComponentId", "ProcessName", "ShapeName", "ShapeType", "Configuration"])
+    writer.writeheader()
+
+    component = json_data.get("bns:Component", {})
+    shapes = component.get("bns:object", {}).get("process", {}).get("shapes", {}).get("shape", [])
+    if isinstance(shapes, dict):
+        shapes = [shapes]
+    for shape in shapes:
+        config = shape.get("configuration") or {}
+        writer.writerow({
+            "ComponentId": component.get("@componentId", ""),
+            "ProcessName": component.get("@name", ""),
+            "ShapeName": shape.get("@userlabel", "null"),
+            "ShapeType": shape.get("@shapetype", ""),
+            "Configuration": ";".join(f"{k}:{v}" for k, v in config.items())
+        })
+    return output.getvalue().replace("\"", "").replace("\'", "")
+
+
+def measure(func, xml_data):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(xml_data)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*", help="Component export XML files")
+    parser.add_argument("--shapes", nargs="*", type=int, default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    if args.files:
+        inputs = [(os.path.basename(path), open(path, encoding="utf-8").read()) for path in args.files]
+    else:
+        inputs = [(f"synthetic-{count}", synthetic_component("bench-1", "Bench", count, shape_mix=PARSE_SHAPE_MIX))
+                  for count in args.shapes]
+
+    print(f"{'input':<20}{'MB':>8}{'path':>12}{'seconds':>10}{'MB/s':>10}{'peak MB':>10}")
+    for label, xml_data in inputs:
+        size_mb = len(xml_data.encode("utf-8")) / 1e6
+        outputs = []
+        for name, func in (("xmltodict", legacy_parse), ("iterparse", parse_process_xml_to_metadata)):
+            result, elapsed, peak = measure(func, xml_data)
+            outputs.append(result)
+            print(f"{label:<20}{size_mb:>8.2f}{name:>12}{elapsed:>10.3f}{size_mb / elapsed:>10.1f}{peak / 1e6:>10.1f}")
+        if outputs[0] != outputs[1]:
+            print(f"{label}: outputs differ")
+
+
+if __name__ == "__main__":
+    main()
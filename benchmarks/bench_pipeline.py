@@ -0,0 +1,229 @@
+# benchmarks/bench_pipeline.py
+# Times every stage of the assessment pipeline on synthetic exports.
+#
+# For each target row count, processes are generated with benchmarks/synthetic.py,
+# parsed, and pushed through categorize -> group -> count -> PDF -> table pages,
+# plus run_evaluation itself, which does the first three in a single pass.
+# Each stage reports seconds, rows per second and peak traced memory.
+#
+#   python benchmarks/bench_pipeline.py                          # 10^2 .. 10^5 rows
+#   python benchmarks/bench_pipeline.py --rows 1000000           # one size
+#   python benchmarks/bench_pipeline.py --json baseline.json     # save results
+#   python benchmarks/bench_pipeline.py --baseline baseline.json # flag regressions
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_exports
+from extract import parse_process_xml_to_metadata
+from models import read_metadata_csv
+from evaluate import (categorizeProcesses, evaluateProcesses, count_shape_type, calculate_statistics,
+                      calculate_subprocess_summary, run_evaluation, evaluate_file, evaluate_file_sharded,
+                      build_pdf)
+from evaluation_memo import ComponentMemo
+from models import METADATA_HEADER
+from table_pages import TableView
+from artifact_store import ArtifactStore
+
+# Stages faster / smaller than this in the baseline are too noisy to compare
+MIN_COMPARE_SECONDS = 0.05
+MIN_COMPARE_MB = 1.0
+
+
+def build_inputs(rows, shapes_per_process, fanout, seed):
+    processes = max(rows // shapes_per_process, 1)
+    return list(generate_exports(processes, shapes_per_process, fanout=fanout, seed=seed))
+
+
+def stage_parse(exports):
+    texts = [parse_process_xml_to_metadata(xml_data) for _, xml_data in exports]
+    # One metadata CSV for the whole batch, as an extract of many processes would give
+    return texts[0] + "".join(text.split("\r\n", 1)[1] for text in texts[1:])
+
+
+def stage_read(csv_text):
+    return list(read_metadata_csv(csv_text)[1])
+
+
+# What /evaluate runs: one pass over the CSV lines, full rows collected as they are categorized
+def stage_evaluation(csv_text, memo=None):
+    return run_evaluation(csv_text, memo=memo)
+
+
+# What /evaluate runs for an upload: the full evaluation goes to a table artifact,
+# from this process or, sharded, from workers reading byte ranges of the file
+def stage_file(csv_path, start, store, workers):
+    with store.table_writer("bench") as writer:
+        if workers > 1:
+            result = evaluate_file_sharded(csv_path, start, writer, workers=workers)
+        else:
+            result = evaluate_file(csv_path, start, writer, workers=1)
+        writer.close()
+    return result
+
+
+def stage_pdf(rows, summaries):
+    with tempfile.TemporaryDirectory() as tmp:
+        build_pdf(os.path.join(tmp, "report.pdf"), count_shape_type(rows), calculate_statistics(summaries),
+                  calculate_subprocess_summary(rows))
+
+
+# A sorted page and a filtered page of the metadata table, as the result pages ask for them
+def stage_table_pages(view):
+    view.page(page=2, sort=3)
+    view.page(page=1, sort=1, descending=True, query="connectoraction")
+
+
+def measure(func, *args, memory=True):
+    gc.collect()
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if memory:
+        # Tracing slows the stage down, so memory is taken from a second run
+        del result
+        gc.collect()
+        tracemalloc.start()
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_size(rows, args):
+    exports = build_inputs(rows, args.shapes, args.fanout, args.seed)
+    results = []
+
+    def record(name, elapsed, peak, count):
+        results.append({"rows": rows, "stage": name, "seconds": round(elapsed, 4),
+                        "rows_per_sec": round(count / elapsed) if elapsed else None,
+                        "peak_mb": round(peak / 1e6, 2) if peak is not None else None})
+
+    csv_text, elapsed, peak = measure(stage_parse, exports, memory=args.memory)
+    del exports
+    record("parse_process_xml_to_metadata", elapsed, peak, rows)
+
+    shape_rows, elapsed, peak = measure(stage_read, csv_text, memory=args.memory)
+    record("read_metadata_csv", elapsed, peak, len(shape_rows))
+    count = len(shape_rows)
+
+    shape_rows, elapsed, peak = measure(categorizeProcesses, shape_rows, memory=args.memory)
+    record("categorizeProcesses", elapsed, peak, count)
+
+    summaries, elapsed, peak = measure(evaluateProcesses, shape_rows, memory=args.memory)
+    record("evaluateProcesses", elapsed, peak, count)
+
+    _, elapsed, peak = measure(count_shape_type, shape_rows, memory=args.memory)
+    record("count_shape_type", elapsed, peak, count)
+
+    # Read + categorize + group + count + subprocesses, straight from the CSV text
+    _, elapsed, peak = measure(stage_evaluation, csv_text, memory=args.memory)
+    record("run_evaluation (read+all)", elapsed, peak, count)
+
+    # First submission: every component is fingerprinted, evaluated and stored
+    _, elapsed, peak = measure(lambda: stage_evaluation(csv_text, ComponentMemo(max_entries=count)),
+                               memory=args.memory)
+    record("run_evaluation (memo cold)", elapsed, peak, count)
+
+    # Resubmission of the same CSV: every component comes from the memo
+    memo = ComponentMemo(max_entries=count)
+    stage_evaluation(csv_text, memo)
+    _, elapsed, peak = measure(stage_evaluation, csv_text, memo, memory=args.memory)
+    record("run_evaluation (memo warm)", elapsed, peak, count)
+
+    if args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ArtifactStore(os.path.join(tmp, "store"))
+            csv_path = os.path.join(tmp, "metadata.csv")
+            with open(csv_path, "w", encoding="utf-8", newline="") as f:
+                f.write(csv_text)
+            start = len(csv_text.split("\n", 1)[0].encode("utf-8")) + 1
+            _, elapsed, peak = measure(stage_file, csv_path, start, store, 1, memory=args.memory)
+            record("file to table (serial)", elapsed, peak, count)
+            for workers in args.workers:
+                # Warm the pool first; peak memory is the parent's only
+                stage_file(csv_path, start, store, workers)
+                _, elapsed, peak = measure(stage_file, csv_path, start, store, workers, memory=args.memory)
+                record(f"sharded ({workers} workers)", elapsed, peak, count)
+
+    _, elapsed, peak = measure(stage_pdf, shape_rows, summaries, memory=args.memory)
+    record("build_pdf", elapsed, peak, count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(os.path.join(tmp, "store"))
+        table_id = store.put({"header": METADATA_HEADER, "rows": [row.fields() for row in shape_rows]},
+                             "bench", kind="table")
+        table = store.table(table_id)
+        _, elapsed, peak = measure(lambda: stage_table_pages(TableView(table)), memory=args.memory)
+        record("table pages (cold)", elapsed, peak, count)
+
+        view = TableView(table)
+        stage_table_pages(view)
+        _, elapsed, peak = measure(stage_table_pages, view, memory=args.memory)
+        record("table pages (warm)", elapsed, peak, count)
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(entry["rows"], entry["stage"]): entry for entry in json.load(f)}
+
+    regressions = []
+    for entry in results:
+        previous = baseline.get((entry["rows"], entry["stage"]))
+        if not previous:
+            continue
+        if previous["seconds"] >= MIN_COMPARE_SECONDS and entry["seconds"] > previous["seconds"] * tolerance:
+            regressions.append(f"{entry['stage']} @ {entry['rows']} rows: "
+                               f"{previous['seconds']}s -> {entry['seconds']}s")
+        if (previous.get("peak_mb") or 0) >= MIN_COMPARE_MB and entry["peak_mb"] and entry["peak_mb"] > previous["peak_mb"] * tolerance:
+            regressions.append(f"{entry['stage']} @ {entry['rows']} rows: "
+                               f"{previous['peak_mb']} MB -> {entry['peak_mb']} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", nargs="*", type=int, default=[100, 1000, 10000, 100000])
+    parser.add_argument("--shapes", type=int, default=40, help="shapes per synthetic process")
+    parser.add_argument("--fanout", type=int, default=1, help="processcall shapes per process")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", nargs="*", type=int, default=[], help="also time sharded evaluation")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the traced memory run")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown ratio vs baseline")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}  {'stage':<32}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+    results = []
+    for rows in args.rows:
+        for entry in run_size(rows, args):
+            results.append(entry)
+            peak = f"{entry['peak_mb']:.1f}" if entry["peak_mb"] is not None else "-"
+            print(f"{entry['rows']:>9}  {entry['stage']:<32}{entry['seconds']:>10.3f}"
+                  f"{entry['rows_per_sec'] or 0:>12,}{peak:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print("Regression:", line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
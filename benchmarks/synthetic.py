@@ -0,0 +1,175 @@
+# benchmarks/synthetic.py
+# Generator for realistic bns:Component process exports.
+#
+# Each process starts with a start shape, runs through a weighted mix of
+# connector and logic shapes wired with dragpoints, and ends with a stop.
+# processcall shapes point at processes generated later in the same batch,
+# so the set forms a call graph that the subprocess crawl can follow.
+#
+#   python benchmarks/synthetic.py out_dir --processes 200 --shapes 40 --fanout 2
+import os
+import random
+import argparse
+from xml.sax.saxutils import quoteattr, escape
+
+# connectorType -> relative weight for connectoraction shapes
+DEFAULT_CONNECTOR_MIX = {
+    "sftp": 20, "http": 20, "rest": 10, "wssoapclientsdk": 8, "salesforceconnector": 8,
+    "mail": 5, "ftp": 5, "odata": 4, "disk": 8, "database": 6, "netsuite": 3,
+    "successfactorsmaster-Q2Q93V-SFSF-priv_prod": 3,
+}
+
+# Shapes between start and stop, with relative weights. "connectoraction" draws
+# from the connector mix; processcall shapes are added separately by fan-out.
+DEFAULT_SHAPE_MIX = {
+    "connectoraction": 22, "map": 14, "documentproperties": 10, "dataprocess": 10,
+    "decision": 8, "branch": 5, "notify": 6, "message": 5, "trycatch": 3, "route": 3,
+    "flowcontrol": 3, "cache": 2, "exception": 2, "returndocuments": 2, "cleanse": 1,
+    "businessrules": 1, "findchanges": 1,
+}
+
+# Step names the evaluation looks for inside dataprocess shapes
+DATAPROCESS_STEPS = [
+    ("Custom Scripting", "12"), ("Split Documents", "2"), ("Combine Documents", "3"),
+    ("Base64 Encode", "4"), ("Base64 Decode", "5"), ("Search/Replace", "7"),
+    ("Character Encode", "10"), ("Pgp Encrypt", "14"), ("Zip", "16"),
+]
+
+_SCRIPT_LINE = "def value = dataContext.getProperties(i).getProperty('document.dynamic.userdefined.key')\n"
+
+
+def _weighted(rng, mix):
+    return rng.choices(list(mix), weights=list(mix.values()))[0]
+
+
+def _configuration(shape_type, index, rng, connector_mix, script_lines):
+    if shape_type == "connectoraction":
+        connector = _weighted(rng, connector_mix)
+        action = rng.choice(["Get", "Send", "Query", "Upsert"])
+        return (f'<connectoraction actionType="{action}" connectorType={quoteattr(connector)} '
+                f'connectionId="conn-{index % 13}" operationId="op-{index % 29}" allowDynamicCredentials="NONE">'
+                f'<parameters/><dynamicProperties/></connectoraction>')
+    if shape_type == "dataprocess":
+        name, process_type = rng.choice(DATAPROCESS_STEPS)
+        body = ""
+        if name == "Custom Scripting":
+            script = escape(_SCRIPT_LINE * script_lines)
+            body = f'<dataprocessscript language="groovy2" useCache="true"><script>{script}</script></dataprocessscript>'
+        return (f'<dataprocess><step index="1" key="1" name={quoteattr(name)} '
+                f'processtype="{process_type}">{body}</step></dataprocess>')
+    if shape_type == "map":
+        return f'<map mapId="map-{index % 17}"/>'
+    if shape_type == "documentproperties":
+        return ('<documentproperties><documentproperty defaultValue="" isDynamicCredential="false" '
+                f'isTradingPartner="false" name="Dynamic Document Property - key{index}" '
+                'persist="false" propertyId="dynamicdocument.key"/></documentproperties>')
+    if shape_type == "decision":
+        return f'<decision comparison="equals" name="Check {index}"><decisionvalue valueType="current"/></decision>'
+    if shape_type == "notify":
+        return f'<notify disableEvent="true" enableUserLog="false" perExecution="false" title="Step {index}"/>'
+    if shape_type == "message":
+        return f'<message combined="false"><msgTxt>Message {index}</msgTxt></message>'
+    if shape_type == "branch":
+        return '<branch numBranches="2"/>'
+    if shape_type == "trycatch":
+        return '<trycatch catchAll="true" retryCount="0"/>'
+    if shape_type == "exception":
+        return f'<exception stopProcess="true" title="Failure {index}"/>'
+    return f"<{shape_type}/>"
+
+
+def _shape(name, shape_type, label, configuration, targets):
+    dragpoints = "".join(
+        f'<dragpoint name="{name}.dragpoint{i}" toShape="{target}" x="0.0" y="0.0"/>'
+        for i, target in enumerate(targets, start=1)
+    )
+    return (f'<shape image="{shape_type}_icon" name="{name}" shapetype="{shape_type}" '
+            f'userlabel={quoteattr(label)} x="0.0" y="0.0">'
+            f'<configuration>{configuration}</configuration><dragpoints>{dragpoints}</dragpoints></shape>')
+
+
+def synthetic_component(component_id, name, shape_count, rng=None, connector_mix=None,
+                        shape_mix=None, subprocess_ids=(), script_lines=20):
+    """
+    One process export with shape_count shapes (at least start and stop). Every
+    id in subprocess_ids gets a processcall shape pointing at it.
+    """
+    rng = rng or random.Random(0)
+    connector_mix = connector_mix or DEFAULT_CONNECTOR_MIX
+    shape_mix = shape_mix or DEFAULT_SHAPE_MIX
+
+    middle = [_weighted(rng, shape_mix) for _ in range(max(shape_count - 2 - len(subprocess_ids), 0))]
+    for subprocess_id in subprocess_ids:
+        middle.insert(rng.randint(0, len(middle)), ("processcall", subprocess_id))
+
+    if rng.random() < 0.7:
+        connector = _weighted(rng, connector_mix)
+        start_config = (f'<connectoraction actionType="Listen" connectorType={quoteattr(connector)} '
+                        f'connectionId="" operationId="op-start"><parameters/></connectoraction>')
+    else:
+        start_config = "<noaction/>"
+
+    shapes = [_shape("shape1", "start", "", start_config, ["shape2"])]
+    last = len(middle) + 2
+    for offset, shape_type in enumerate(middle, start=2):
+        targets = [f"shape{offset + 1}"]
+        if isinstance(shape_type, tuple):
+            shape_type, subprocess_id = shape_type
+            configuration = f'<processcall abort="true" processId="{subprocess_id}" wait="true"><parameters/></processcall>'
+        else:
+            configuration = _configuration(shape_type, offset, rng, connector_mix, script_lines)
+            # Branches and decisions fan out; the extra path skips ahead
+            if shape_type in ("branch", "decision") and offset + 2 <= last:
+                targets.append(f"shape{offset + 2}")
+        label = "" if rng.random() < 0.3 else f"{shape_type.title()} {offset}"
+        shapes.append(_shape(f"shape{offset}", shape_type, label, configuration, targets))
+    shapes.append(_shape(f"shape{last}", "stop", "", '<stop continue="true"/>', []))
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<bns:Component xmlns:bns="http://api.platform.boomi.com/" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        f'componentId="{component_id}" version="1" name={quoteattr(name)} type="process">'
+        '<bns:encryptedValues/><bns:description/>'
+        '<bns:object><process allowSimultaneous="false" enableUserLog="false"><shapes>'
+        f'{"".join(shapes)}</shapes></process></bns:object></bns:Component>'
+    )
+
+
+def generate_exports(processes, shapes_per_process, connector_mix=None, shape_mix=None,
+                     fanout=1, script_lines=20, seed=0):
+    """
+    Yield (component_id, xml) for a batch of processes. Each process calls up to
+    fanout processes later in the batch, so the last ones are pure subprocesses.
+    """
+    rng = random.Random(seed)
+    ids = [f"synth-{seed}-{i:07d}" for i in range(processes)]
+    for i, component_id in enumerate(ids):
+        later = ids[i + 1:]
+        children = rng.sample(later, min(fanout, len(later))) if later else []
+        yield component_id, synthetic_component(
+            component_id, f"Synthetic Process {i}", shapes_per_process, rng,
+            connector_mix, shape_mix, children, script_lines
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic Boomi process exports")
+    parser.add_argument("out_dir")
+    parser.add_argument("--processes", type=int, default=100)
+    parser.add_argument("--shapes", type=int, default=40, help="shapes per process")
+    parser.add_argument("--fanout", type=int, default=1, help="processcall shapes per process")
+    parser.add_argument("--script-lines", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for component_id, xml_data in generate_exports(args.processes, args.shapes, fanout=args.fanout,
+                                                   script_lines=args.script_lines, seed=args.seed):
+        with open(os.path.join(args.out_dir, f"{component_id}.xml"), "w", encoding="utf-8") as f:
+            f.write(xml_data)
+    print(f"Wrote {args.processes} exports to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+# boomi_api.py
+# Shared plumbing for talking to the Boomi AtomSphere API: one pooled
+# keep-alive session per account, a rate-limit-aware request scheduler and a
+# bounded worker pool for fan-out calls.
+import os
+import re
+import time
+import random
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+from export_cache import export_cache
+from component_xml import _local_name
+
+BASE_URL = "https://api.boomi.com/api/rest/v1"
+
+# Upper bound on concurrent exports per request, also used as the connection pool size
+MAX_WORKERS = int(os.getenv("BOOMI_MAX_WORKERS", "8"))
+
+# Per-account request budget. AtomSphere throttles around 10 calls/second per
+# account; these limits are per worker process.
+RATE_LIMIT = float(os.getenv("BOOMI_RATE_LIMIT", "10"))
+RATE_BURST = int(os.getenv("BOOMI_RATE_BURST", "10"))
+MAX_IN_FLIGHT = int(os.getenv("BOOMI_MAX_IN_FLIGHT", str(MAX_WORKERS)))
+MAX_RETRIES = int(os.getenv("BOOMI_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("BOOMI_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("BOOMI_BACKOFF_MAX", "30"))
+REQUEST_TIMEOUT = (10, float(os.getenv("BOOMI_READ_TIMEOUT", "300")))
+
+# Keep-alive sessions kept per worker process, least recently used dropped first
+MAX_SESSIONS = int(os.getenv("BOOMI_MAX_SESSIONS", "32"))
+
+# Throttling and transient gateway errors worth another attempt
+RETRY_STATUSES = {429, 502, 503, 504}
+
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_session(username, password, account_id):
+    """
+    Return the keep-alive session for this account and user, creating it on
+    first use. A session is replaced when the password changes; only the
+    MAX_SESSIONS most recently used are kept.
+    """
+    key = (account_id, username)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is not None and session.auth.password == password:
+            _sessions.move_to_end(key)
+            return session
+        # Callers still holding a replaced or evicted session keep using it
+        session = requests.Session()
+        session.auth = HTTPBasicAuth(username, password)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+        session.mount("https://", adapter)
+        _sessions[key] = session
+        _sessions.move_to_end(key)
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+        return session
+
+
+class TokenBucket:
+    """Allows rate calls per second on average with bursts up to capacity; can be paused account-wide."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+def _get_limiter(account_id):
+    with _limiters_lock:
+        limiter = _limiters.get(account_id)
+        if limiter is None:
+            limiter = (TokenBucket(RATE_LIMIT, RATE_BURST), threading.BoundedSemaphore(MAX_IN_FLIGHT))
+            _limiters[account_id] = limiter
+        return limiter
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def send(username, password, account_id, method, url, **kwargs):
+    """
+    Issue one API call through the account's scheduler: wait for a token, hold an
+    in-flight slot while the request runs, and retry throttled (429/503) or failed
+    calls with jittered exponential backoff. A Retry-After header pauses the whole
+    account for that long. Returns the final response, or raises the last
+    RequestException once retries are exhausted.
+    """
+    session = get_session(username, password, account_id)
+    bucket, in_flight = _get_limiter(account_id)
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        try:
+            with in_flight:
+                response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                raise
+            print("Retrying after request error:", e)
+            time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+            continue
+
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+
+        delay = _retry_after_seconds(response)
+        if delay is not None:
+            bucket.pause(min(delay, BACKOFF_MAX))
+        else:
+            time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+        print("Retrying throttled request:", response.status_code, url)
+    return response
+
+
+def map_bounded(func, items, max_workers=MAX_WORKERS):
+    """
+    Call func on every item using at most max_workers threads.
+    Results come back in the order of items; an item whose call raises yields None.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def safe_call(item):
+        try:
+            return func(item)
+        except Exception as e:
+            print("Worker error:", item, e)
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(safe_call, items))
+
+
+class QueryError(Exception):
+    """A queryMore page failed after earlier pages were already yielded."""
+
+
+# Yields the result pages of an <ObjectType>/query call, following the
+# queryToken / queryMore continuation until the result set is exhausted.
+# A failed first page yields nothing; a failed later page raises QueryError,
+# so callers never mistake a partial result set for the whole one.
+def iter_query_pages(username, password, account_id, object_type, query_filter=None):
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json"
+    }
+    pages = 0
+    try:
+        response = send(username, password, account_id, "POST",
+                        f"{BASE_URL}/{account_id}/{object_type}/query", json=query_filter, headers=headers)
+        while True:
+            if response.status_code != 200:
+                if pages:
+                    raise QueryError(f"{object_type} query stopped after {pages} pages: "
+                                     f"{response.status_code} {response.text}")
+                print("Error:", response.status_code, response.text)
+                return
+            page = response.json()
+            pages += 1
+            yield page
+
+            query_token = page.get("queryToken")
+            if not query_token:
+                return
+            response = send(
+                username, password, account_id, "POST",
+                f"{BASE_URL}/{account_id}/{object_type}/queryMore",
+                data=query_token,
+                headers={"Accept": "application/json", "Content-Type": "text/plain"}
+            )
+    except requests.exceptions.RequestException as e:
+        if pages:
+            raise QueryError(f"{object_type} query stopped after {pages} pages: {e}") from e
+        print("Request Exception:", e)
+
+
+# Component ids per ComponentMetadata query; keeps the OR filter well under URL/body limits
+VERSION_BATCH_SIZE = 100
+
+
+def get_current_versions(username, password, account_id, component_ids):
+    """Map componentId -> current version with one ComponentMetadata query per batch."""
+    component_ids = list(dict.fromkeys(component_ids))
+    versions = {}
+    for start in range(0, len(component_ids), VERSION_BATCH_SIZE):
+        batch = component_ids[start:start + VERSION_BATCH_SIZE]
+        query_filter = {
+            "QueryFilter": {
+                "expression": {
+                    "operator": "and",
+                    "nestedExpression": [
+                        {"operator": "EQUALS", "property": "currentVersion", "argument": ["true"]},
+                        {
+                            "operator": "or",
+                            "nestedExpression": [
+                                {"operator": "EQUALS", "property": "componentId", "argument": [component_id]}
+                                for component_id in batch
+                            ]
+                        }
+                    ]
+                }
+            }
+        }
+        try:
+            for page in iter_query_pages(username, password, account_id, "ComponentMetadata", query_filter):
+                for item in page.get("result", []):
+                    if item.get("componentId") and item.get("version") is not None:
+                        versions[item["componentId"]] = str(item["version"])
+        except QueryError as e:
+            # Components without a known version are simply exported again
+            print("Version lookup incomplete:", e)
+    return versions
+
+
+_VERSION_ATTR = re.compile(r'<bns:Component\b[^>]*?\sversion="([^"]+)"')
+
+
+def export_component(component_id, username, password, account_id, version=None):
+    """
+    Return the Component/{id}/export XML, served from the local export cache when
+    the requested version is already there. Without a version the export is always
+    fetched (its freshness can't be checked) but is still cached under the version
+    found on the exported component.
+    """
+    cached = export_cache.get(account_id, component_id, version)
+    if cached is not None:
+        return cached
+
+    url = f"{BASE_URL}/{account_id}/Component/{component_id}/export"
+    headers = {
+        "Accept": "application/xml"
+    }
+    try:
+        response = send(username, password, account_id, "GET", url, headers=headers)
+        if response.status_code == 200:
+            xml_data = response.text
+            if version is None:
+                match = _VERSION_ATTR.search(xml_data, 0, 4096)
+                version = match.group(1) if match else None
+            export_cache.put(account_id, component_id, version, xml_data)
+            return xml_data
+        print("Failed export:", response.status_code, response.text)
+    except requests.exceptions.RequestException as e:
+        print("Export error:", e)
+    return None
+
+
+# Component ids per Component/bulk request, the API's limit
+BULK_BATCH_SIZE = 100
+
+
+# The identifying attributes of a <bns:Component> (or bulk <bns:Result>) element
+def _component_summary(elem):
+    return {
+        "name": elem.get("name", ""),
+        "type": elem.get("type", ""),
+        "subType": elem.get("subType", ""),
+        "folder": elem.get("folderFullPath", ""),
+        "version": elem.get("version", ""),
+    }
+
+
+# Summaries of one batch from Component/bulk, or None when the bulk call itself failed
+def _get_component_batch(username, password, account_id, batch):
+    components = {}
+    body = {"type": "GET", "request": [{"id": component_id} for component_id in batch]}
+    headers = {"Accept": "application/xml", "Content-Type": "application/json"}
+    try:
+        response = send(username, password, account_id, "POST", f"{BASE_URL}/{account_id}/Component/bulk",
+                        json=body, headers=headers)
+        if response.status_code == 200:
+            for item in ET.fromstring(response.content):
+                if _local_name(item.tag) != "response" or item.get("statusCode") != "200":
+                    continue
+                for result in item:
+                    if _local_name(result.tag) == "Result" and result.get("componentId"):
+                        components[result.get("componentId")] = _component_summary(result)
+            return components
+        print("Failed bulk component GET:", response.status_code, response.text)
+    except (requests.exceptions.RequestException, ET.ParseError) as e:
+        print("Bulk component error:", e)
+    return None
+
+
+def _get_component(username, password, account_id, component_id):
+    try:
+        response = send(username, password, account_id, "GET", f"{BASE_URL}/{account_id}/Component/{component_id}",
+                        headers={"Accept": "application/xml"})
+        if response.status_code == 200:
+            return _component_summary(ET.fromstring(response.content))
+        print("Failed component GET:", response.status_code, response.text)
+    except (requests.exceptions.RequestException, ET.ParseError) as e:
+        print("Component error:", e)
+    return None
+
+
+def get_components_bulk(username, password, account_id, component_ids):
+    """
+    Map componentId -> {"name", "type", "subType", "folder", "version"}, each id
+    requested once: one Component/bulk call per batch of 100, batches running
+    concurrently under the usual worker and per-account limits. The ids of a batch
+    whose bulk call fails are fetched one by one; ids that are not found are left out.
+    """
+    component_ids = list(dict.fromkeys(component_ids))
+    batches = [component_ids[start:start + BULK_BATCH_SIZE]
+               for start in range(0, len(component_ids), BULK_BATCH_SIZE)]
+    components = {}
+    missing = []
+    results = map_bounded(lambda batch: _get_component_batch(username, password, account_id, batch), batches)
+    for batch, result in zip(batches, results):
+        if result is None:
+            missing.extend(batch)
+        else:
+            components.update(result)
+
+    if missing:
+        singles = map_bounded(lambda component_id: _get_component(username, password, account_id, component_id),
+                              missing)
+        for component_id, summary in zip(missing, singles):
+            if summary is not None:
+                components[component_id] = summary
+    return components
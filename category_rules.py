@@ -0,0 +1,234 @@
+# category_rules.py
+# Categorization rules for the evaluation, as data.
+#
+# The default table below is compiled once into dicts keyed by shape type,
+# dataprocess step name and connector type, so classifying a row is a couple
+# of hash lookups however many rules exist. More rules can be merged in from
+# a JSON file (CATEGORY_RULES_FILE, same layout as DEFAULT_RULES) or added at
+# runtime with add_shape_rule / add_connector_rule.
+#
+# The alternatives double as the shape -> CPI mapping used by the migration
+# preview and the report. They are looked up without regard to case or
+# whitespace, so "Zip", "zip" and "Pgp Decrypt" / "pgp Decrypt" all resolve.
+import os
+import re
+import json
+import threading
+
+CATEGORY_RULES_FILE = os.getenv("CATEGORY_RULES_FILE")
+
+CATEGORIES = ("Migrate", "Adapt", "Evaluate")
+
+# Spellings of known names whose alternative is remembered per rule set
+RESOLVED_NAMES_MAX = 4096
+
+DEFAULT_RULES = {
+    # Shape types, and step names inside dataprocess shapes
+    "shapes": {
+        "Migrate": ["message", "processcall", "processroute", "Xslt Transformation", "zip",
+                    "Unzip", "dataprocess", "Base64 Decode", "Base64 Encode", "Pgp Encrypt",
+                    "pgp Decrypt", "Split Documents", "branch", "route", "start", "noaction:",
+                    "stop", "trycatch", "catcherrors", "returndocuments"],
+        "Adapt": ["setproperties", "map", "cache", "flowcontrol", "Character Decode",
+                  "Character Encode", "Combine Documents", "Search/Replace", "Custom Scripting",
+                  "customscripting", "documentproperties", "dynamicdocumentproperties",
+                  "processproperties", "dynamicprocessproperties", "notify", "decision", "exception"],
+    },
+    # connectorType of connectoraction and start shapes
+    "connectors": {
+        "Migrate": ["ftp", "sftp", "http", "mail", "odata", "rest",
+                    "salesforceconnector", "wssoapclientsdk"],
+        "Adapt": ["disk", "successfactorsmaster-Q2Q93V-SFSF-priv_prod"],
+    },
+    # Alternative offered in the report for each counted shape/connector type
+    "alternatives": {
+        "disk": "sftp",
+        "map": "messageMapping",
+        "message": "contentModifier",
+        "processcall": "processCall",
+        "processroute": "router",
+        "Base64 Decode": "base64Decoder",
+        "Base64 Encode": "base64Encoder",
+        "Character Decode": "groovyScript",
+        "Character Encode": "groovyScript",
+        "Combine Documents": "gather",
+        "Custom Scripting": "groovyScript",
+        "Search/Replace": "messageMapping",
+        "Split Documents": "generalSplitter",
+        "Mapjsontomultipartformdatamime": "groovyScript",
+        "Mapmultipartformdatamimetojson": "groovyScript",
+        "Pgp Encrypt": "pgpEncryptor",
+        "Pgp Decrypt": "pgpDecryptor",
+        "Xslt Transformation": "xsltMapping",
+        "Zip": "zipCompression",
+        "Unzip": "zipDecompression",
+        "branch": "sequentialMulticast",
+        "route": "router",
+        "decision": "router",
+        "start": "start",
+        "stop": "end",
+        "catcherrors": "exceptionSubprocess",
+        "exception": "exceptionSubprocess",
+        "setproperties": "contentModifier",
+        "cache": "data store",
+        "flowcontrol": "splitter/multicast/gather",
+        "businessrules": "routers/validators",
+        "diskconnector": "sftp",
+        "customscripting": "groovyScript",
+        "documentproperties": "contentModifier",
+        "dynamicdocumentproperties": "groovyScript",
+        "processproperties": "contentModifier",
+        "dynamicprocessproperties": "groovyScript",
+        "ftp": "ftp",
+        "sftp": "sftp",
+        "http": "http",
+        "mail": "mail",
+        "odata": "odata",
+        "rest": "http",
+        "salesforce": "salesforce",
+        "netsuite": "netsuite",
+        "successfactors": "successfactors",
+        "successfactorsmaster-Q2Q93V-SFSF-priv_prod": "successfactors",
+        "wssoapclientsdk": "soap",
+        "cleanse": "NA",
+        "programcommand": "groovyScript",
+        "aws": "openConnector",
+        "findchanges": "messageMapping",
+        "dataprocess": "Base64-Encode/Decode/Spiltter/zip-unzip/encrypt-decrypt/xslt",
+        "returndocuments": "end",
+        "notify": "groovy script with mpl logs",
+    },
+}
+
+# Extracted configurations look like "connectoraction:{@connectorType: sftp, ...}"
+# or "processcall:{@abort: true, @processId: abc, ...}", so the value may follow
+# the colon after a space
+CONNECTOR_TYPE_PATTERN = re.compile(r'@connectorType\s*:\s*([^,\s]+)')
+PROCESS_ID_PATTERN = re.compile(r'@processId\s*:\s*([^\s,}]+)')
+NAME_PATTERN = re.compile(r'@name:([^,]+)')
+
+
+def normalize_name(name):
+    return "".join(name.split()).lower()
+
+
+# connectoraction and start shapes map by their connectorType when they have one
+def alternative_key(shape_type, configuration):
+    if shape_type in ("connectoraction", "start") and configuration:
+        match = CONNECTOR_TYPE_PATTERN.search(configuration)
+        if match:
+            return match.group(1)
+    return shape_type
+
+
+class RuleSet:
+    def __init__(self, table=None):
+        self.shapes = {}
+        self.connectors = {}
+        self.alternatives = {}
+        # normalize_name(name) -> alternative, and the names already resolved through it
+        self._alternative_index = {}
+        self._resolved = {}
+        # Bumped on every change so cached categorizations can tell they are stale
+        self.version = 0
+        self._lock = threading.Lock()
+        if table:
+            self.load_table(table)
+
+    def load_table(self, table):
+        """Merge a rules table ({"shapes": {category: [...]}, "connectors": ..., "alternatives": {...}})."""
+        # Adapt first so a name listed under both keeps the Migrate precedence it always had
+        for kind in ("shapes", "connectors"):
+            for category in ("Evaluate", "Adapt", "Migrate"):
+                for name in table.get(kind, {}).get(category, []):
+                    self._add(kind, name, category, None)
+        for name, alternative in table.get("alternatives", {}).items():
+            self._add(None, name, None, alternative)
+
+    def load_file(self, path):
+        with open(path, encoding="utf-8") as f:
+            self.load_table(json.load(f))
+
+    def _add(self, kind, name, category, alternative):
+        if category is not None and category not in CATEGORIES:
+            raise ValueError(f"Unknown category {category!r}, expected one of {CATEGORIES}")
+        with self._lock:
+            if kind is not None:
+                getattr(self, kind)[name] = category
+            if alternative is not None:
+                self.alternatives[name] = alternative
+                self._alternative_index[normalize_name(name)] = alternative
+                self._resolved = {}
+            self.version += 1
+
+    def add_shape_rule(self, name, category, alternative=None):
+        """Categorize a shape type (or dataprocess step name) without touching the code."""
+        self._add("shapes", name, category, alternative)
+
+    def add_connector_rule(self, connector_type, category, alternative=None):
+        """Categorize a connectorType without touching the code."""
+        self._add("connectors", connector_type, category, alternative)
+
+    def alternative(self, name):
+        """The CPI alternative for a shape or connector type, "NA" when there is none."""
+        alternative = self._resolved.get(name)
+        if alternative is None:
+            with self._lock:
+                alternative = self._alternative_index.get(normalize_name(name))
+                if alternative is None:
+                    return "NA"
+                # Names come from uploaded CSVs, so only those of a known alternative are
+                # remembered, and only so many spellings of them
+                if len(self._resolved) < RESOLVED_NAMES_MAX:
+                    self._resolved[name] = alternative
+        return alternative
+
+    def alternatives_for(self, names):
+        """alternative() over a whole column of names, each distinct name resolved once."""
+        seen = {}
+        alternatives = []
+        for name in names:
+            alternative = seen.get(name)
+            if alternative is None:
+                alternative = seen[name] = self.alternative(name)
+            alternatives.append(alternative)
+        return alternatives
+
+    def shape_alternatives(self, shapes):
+        """
+        Alternatives for (shape_type, configuration) pairs. Connector shapes map by
+        their connectorType and fall back to the shape type when it has none.
+        """
+        shapes = list(shapes)
+        alternatives = self.alternatives_for([alternative_key(*shape) for shape in shapes])
+        for i, (shape_type, _) in enumerate(shapes):
+            if alternatives[i] == "NA":
+                alternatives[i] = self.alternative(shape_type)
+        return alternatives
+
+    def categorize(self, row):
+        shape_type = row.shape_type.strip() if row.shape_type is not None else ""
+        configuration = row.configuration or ""
+
+        if shape_type == "connectoraction" or shape_type == "start":
+            match = CONNECTOR_TYPE_PATTERN.search(configuration)
+            category = self.connectors.get(match.group(1)) if match else None
+            if category:
+                return category
+            if shape_type == "start" and "connectoraction" not in row.to_line():
+                return "Migrate"
+            return "Evaluate"
+        if shape_type == "dataprocess":
+            match = NAME_PATTERN.search(configuration)
+            if match:
+                return self.shapes.get(match.group(1).strip(), "Evaluate")
+            return "Evaluate"
+        return self.shapes.get(shape_type, "Evaluate")
+
+
+category_rules = RuleSet(DEFAULT_RULES)
+if CATEGORY_RULES_FILE:
+    category_rules.load_file(CATEGORY_RULES_FILE)
+
+add_shape_rule = category_rules.add_shape_rule
+add_connector_rule = category_rules.add_connector_rule
@@ -0,0 +1,228 @@
+# component_pipeline.py
+# One fetch and one parse per component, shared by extraction and migration.
+#
+# Every export is walked once into a ParsedComponent holding the metadata rows
+# (ComponentId/ProcessName/ShapeName/ShapeType/Configuration), the migration
+# label of each shape and its processcall targets. The metadata and migration
+# views are both cut from that, and parsed components are remembered by
+# component version, so running /migrate after /extract on the same processes
+# neither exports nor parses them again.
+import os
+
+from boomi_api import export_component, get_current_versions, map_bounded
+from category_rules import category_rules
+from component_xml import iter_process_shapes
+from evaluation_memo import ComponentMemo
+from flow_graph import shape_targets, revised_sequence
+from export_archive import open_replay, run_archive
+from models import ShapeRow, MigrationRow
+
+# Parsed components kept per worker process, 0 disables reuse across runs
+PARSED_COMPONENT_CACHE = int(os.getenv("PARSED_COMPONENT_CACHE", "2000"))
+# ... and the most memory (approximately) they may hold, since a component keeps
+# its shapes' whole configurations
+PARSED_COMPONENT_CACHE_MB = int(os.getenv("PARSED_COMPONENT_CACHE_MB", "64"))
+# Rough cost of the objects behind one shape, on top of its strings
+SHAPE_OVERHEAD_BYTES = 400
+
+
+# Approximate memory held by a parsed component
+def parsed_size(parsed):
+    size = 0
+    for row, label in zip(parsed.rows, parsed.labels):
+        size += SHAPE_OVERHEAD_BYTES + len(label) + sum(len(field) for field in row.fields())
+    return size
+
+
+parsed_components = ComponentMemo(PARSED_COMPONENT_CACHE, max_bytes=PARSED_COMPONENT_CACHE_MB * 1024 * 1024,
+                                  sizeof=parsed_size)
+
+
+def get_xml_from_boomi(process_id, username, password, accound_id, version=None):
+    return export_component(process_id, username, password, accound_id, version)
+
+
+# It removes single and double quotes from the strings, and folds line breaks
+# so a value always stays on one CSV line
+def clean_configuration(csv_data):
+    csv_data = csv_data.replace("\"", "").replace("\'", "")
+    if "\n" in csv_data or "\r" in csv_data:
+        csv_data = " ".join(csv_data.splitlines())
+    return csv_data
+
+
+def metadata_row(component, shape):
+    shape_name = shape.get("@userlabel", "null")
+    shape_type = shape.get("@shapetype", "")
+    config = shape.get("configuration")
+    if not isinstance(config, dict):
+        config = {}
+
+    config_str = ";".join(f"{k}:{v}" for k, v in config.items())
+
+    return ShapeRow(
+        clean_configuration(component.get("@componentId", "")),
+        clean_configuration(component.get("@name", "")),
+        clean_configuration(shape_name),
+        clean_configuration(shape_type),
+        clean_configuration(config_str)
+    )
+
+
+# Returns the @processId of a processcall shape, or None for any other shape
+def get_subprocess_id(shape):
+    if shape.get("@shapetype") != "processcall":
+        return None
+    config = shape.get("configuration")
+    process_call = config.get("processcall") if isinstance(config, dict) else None
+    return process_call.get("@processId") if isinstance(process_call, dict) else None
+
+
+class ParsedComponent:
+    """Everything both views need from one export; rows, labels and sequence run in shape order."""
+    __slots__ = ("component_id", "version", "rows", "labels", "sequence", "subprocess_ids")
+
+    def __init__(self, component_id, version=None):
+        self.component_id = component_id
+        self.version = version
+        self.rows = []
+        self.labels = []
+        # Execution position of each shape from flow_graph, None when unreachable
+        self.sequence = []
+        self.subprocess_ids = []
+
+
+def parse_component(component_id, xml_data, version=None):
+    parsed = ParsedComponent(component_id, version)
+    current_component = None
+    shape_label = ""
+    names = []
+    targets = []
+    for component, shape in iter_process_shapes(xml_data):
+        # A shape without a user label is shown under the last label seen,
+        # starting from the process name
+        if component is not current_component:
+            current_component = component
+            shape_label = component.get("@name", "")
+        shape_name = shape.get("@userlabel", "null")
+        if shape_name != "":
+            shape_label = shape_name
+
+        parsed.rows.append(metadata_row(component, shape))
+        parsed.labels.append(clean_configuration(shape_label))
+        names.append(shape.get("@name"))
+        targets.append(shape_targets(shape))
+        process_id = get_subprocess_id(shape)
+        if process_id:
+            parsed.subprocess_ids.append(process_id)
+
+    parsed.sequence = revised_sequence(names, targets, [row.shape_type for row in parsed.rows])
+    return parsed
+
+
+def metadata_view(components):
+    return [row for parsed in components for row in parsed.rows]
+
+
+# Step numbers start at 1 in every component and follow the export; the revised
+# sequence is the execution order. Connector shapes are mapped by their
+# connectorType, everything else by shape type.
+def migration_view(components):
+    rows = []
+    for parsed in components:
+        alternatives = category_rules.shape_alternatives((row.shape_type, row.configuration) for row in parsed.rows)
+        shapes = zip(parsed.rows, parsed.labels, alternatives, parsed.sequence)
+        for step_no, (row, label, alternative, sequence) in enumerate(shapes, 1):
+            if sequence is None:
+                status = "Unreachable"
+            else:
+                status = "Mapped" if alternative != "NA" else "Unmapped"
+            rows.append(MigrationRow(
+                step_no,
+                label,
+                row.shape_type,
+                clean_configuration(alternative),
+                sequence if sequence is not None else "",
+                status
+            ))
+    return rows
+
+
+# Parse the selected processes, each export fetched and parsed once.
+# Exports run concurrently on a bounded pool; results keep the selection order
+# and a process whose export or parse fails is skipped instead of aborting the batch.
+# With include_subprocesses the selection is treated as the roots of a breadth-first
+# crawl over processcall references: each level is exported concurrently and every
+# component is exported once, however many parents call it.
+# progress, when given, is called as progress(process_id, ok) after each export
+# and as progress.add_total(count) whenever processes are queued.
+# archive, when given, receives every raw export (see export_archive); replay
+# reads the exports from an earlier run's archive instead of the API.
+def get_components(username, password, account_id, selected_processes, include_subprocesses=False, progress=None,
+                   archive=None, replay=None):
+    replay = open_replay(replay)
+    with run_archive(account_id, selected_processes, archive, replay) as archive:
+        return crawl_components(username, password, account_id, selected_processes, include_subprocesses, progress,
+                                archive, replay)
+
+
+def crawl_components(username, password, account_id, selected_processes, include_subprocesses, progress, archive,
+                     replay):
+    # Reuse is by component version, so only live runs that are not being archived use it
+    use_memo = replay is None and archive is None
+
+    def load_component(process_id):
+        version = versions.get(process_id)
+        key = (account_id, process_id, version)
+        if use_memo and version is not None:
+            parsed = parsed_components.get(key)
+            if parsed is not None:
+                return parsed
+
+        if replay is not None:
+            xml_data = replay.get(process_id)
+        else:
+            xml_data = get_xml_from_boomi(process_id, username, password, account_id, version)
+            if archive is not None:
+                archive.add(process_id, version, xml_data)
+        if not xml_data:
+            return None
+
+        parsed = parse_component(process_id, xml_data, version)
+        if use_memo and version is not None:
+            parsed_components.put(key, parsed)
+        return parsed
+
+    def export_component_once(process_id):
+        parsed = None
+        try:
+            parsed = load_component(process_id)
+            return parsed
+        finally:
+            if progress:
+                progress(process_id, parsed is not None)
+
+    components = []
+    frontier = list(dict.fromkeys(selected_processes))
+    seen = set(frontier)
+    while frontier:
+        if progress:
+            progress.add_total(len(frontier))
+        if replay is not None:
+            versions = replay.versions(frontier)
+        else:
+            # One metadata query per 100 processes tells us which exports the cache can serve
+            versions = get_current_versions(username, password, account_id, frontier)
+
+        next_frontier = []
+        for parsed in map_bounded(export_component_once, frontier):
+            if parsed is None:
+                continue
+            components.append(parsed)
+            if include_subprocesses:
+                for subprocess_id in parsed.subprocess_ids:
+                    if subprocess_id not in seen:
+                        seen.add(subprocess_id)
+                        next_frontier.append(subprocess_id)
+        frontier = next_frontier
+    return components
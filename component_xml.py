@@ -0,0 +1,104 @@
+# component_xml.py
+# Incremental reader for Boomi Component/{id}/export documents.
+#
+# The export is walked with ElementTree.iterparse and every process shape is
+# emitted as soon as its closing tag is read, then dropped from the tree, so
+# memory grows with the largest shape rather than with the whole document.
+# Each shape is handed out in the same dict layout xmltodict would produce
+# ("@attr" keys, child elements by name, repeated children as lists,
+# "#text" for mixed content), so callers keep their existing lookups.
+import io
+import xml.etree.ElementTree as ET
+
+# Element path (local names) of a shape below the bns:Component root
+_SHAPE_PATH = ("Component", "object", "process", "shapes", "shape")
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _qualified_name(tag, prefixes):
+    if tag[0] != "{":
+        return tag
+    uri, local = tag[1:].split("}", 1)
+    prefix = prefixes.get(uri)
+    return f"{prefix}:{local}" if prefix else local
+
+
+def element_to_dict(elem, prefixes=None):
+    """Convert one element subtree the way xmltodict.parse does with its defaults."""
+    prefixes = prefixes or {}
+    item = None
+    if elem.attrib:
+        item = {"@" + _qualified_name(key, prefixes): value for key, value in elem.attrib.items()}
+
+    data = [elem.text] if elem.text else []
+    for child in elem:
+        if item is None:
+            item = {}
+        key = _qualified_name(child.tag, prefixes)
+        value = element_to_dict(child, prefixes)
+        if key in item:
+            existing = item[key]
+            if isinstance(existing, list):
+                existing.append(value)
+            else:
+                item[key] = [existing, value]
+        else:
+            item[key] = value
+        if child.tail:
+            data.append(child.tail)
+
+    text = "".join(data).strip() or None
+    if item is None:
+        return text
+    if text:
+        item["#text"] = text
+    return item
+
+
+def iter_process_shapes(source):
+    """
+    Yield (component, shape) for every process shape in an export, in document order.
+
+    source is the export as str/bytes or a binary file object. component holds the
+    root's "@componentId", "@name", "@version" and "@type" attributes; shape is the
+    xmltodict-style dict of the <shape> element.
+    """
+    if isinstance(source, str):
+        source = io.BytesIO(source.encode("utf-8"))
+    elif isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    prefixes = {}
+    path = []
+    parents = []
+    component = None
+    for event, payload in ET.iterparse(source, events=("start-ns", "start", "end")):
+        if event == "start-ns":
+            prefix, uri = payload
+            prefixes.setdefault(uri, prefix)
+            continue
+
+        elem = payload
+        if event == "start":
+            path.append(_local_name(elem.tag))
+            parents.append(elem)
+            if len(path) == 1 and path[0] == "Component":
+                component = {
+                    "@" + key: elem.attrib[key]
+                    for key in ("componentId", "name", "version", "type") if key in elem.attrib
+                }
+            continue
+
+        is_shape = tuple(path) == _SHAPE_PATH
+        if is_shape and component is not None:
+            yield component, element_to_dict(elem, prefixes) or {}
+        path.pop()
+        parents.pop()
+        # Shapes and every subtree outside the shapes list are discarded once read;
+        # only ancestors of the element currently being parsed stay in memory
+        if parents and (is_shape or len(path) < len(_SHAPE_PATH) - 1):
+            elem.clear()
+            parents[-1].remove(elem)
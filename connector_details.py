@@ -0,0 +1,59 @@
+# connector_details.py
+# Connector Details step of the migration: which connection and operation each
+# connector shape uses.
+#
+# connectoraction (and connector start) shapes only carry connectionId and
+# operationId references. All of them are collected across the selected
+# processes first and resolved together, so a connection shared by fifty
+# processes is requested once, and up to 100 ids go in one Component/bulk call.
+import re
+
+from boomi_api import get_components_bulk
+from category_rules import CONNECTOR_TYPE_PATTERN
+from component_pipeline import clean_configuration
+
+ACTION_TYPE_PATTERN = re.compile(r'@actionType\s*:\s*([^,\s}]+)')
+CONNECTION_ID_PATTERN = re.compile(r'@connectionId\s*:\s*([^,\s}]+)')
+OPERATION_ID_PATTERN = re.compile(r'@operationId\s*:\s*([^,\s}]+)')
+
+
+def _match(pattern, text):
+    match = pattern.search(text)
+    return match.group(1) if match else ""
+
+
+def connector_refs(components):
+    """
+    (process name, step no, shape label, connector type, action, connection id,
+    operation id) for every connector shape of the parsed components.
+    """
+    refs = []
+    for parsed in components:
+        for step_no, (row, label) in enumerate(zip(parsed.rows, parsed.labels), 1):
+            if row.shape_type not in ("connectoraction", "start") or not row.configuration:
+                continue
+            connector_type = _match(CONNECTOR_TYPE_PATTERN, row.configuration)
+            if not connector_type:
+                continue
+            refs.append((row.process_name, step_no, label, connector_type,
+                         _match(ACTION_TYPE_PATTERN, row.configuration),
+                         _match(CONNECTION_ID_PATTERN, row.configuration),
+                         _match(OPERATION_ID_PATTERN, row.configuration)))
+    return refs
+
+
+def connector_details(username, password, account_id, components):
+    """CONNECTOR_HEADER rows, with every distinct connection and operation resolved once."""
+    refs = connector_refs(components)
+    component_ids = {ref[5] for ref in refs if ref[5]} | {ref[6] for ref in refs if ref[6]}
+    resolved = get_components_bulk(username, password, account_id, sorted(component_ids)) if component_ids else {}
+
+    def name(component_id):
+        summary = resolved.get(component_id)
+        return clean_configuration(summary["name"]) if summary else ""
+
+    rows = []
+    for process_name, step_no, label, connector_type, action, connection_id, operation_id in refs:
+        rows.append([process_name, str(step_no), label, connector_type, action,
+                     connection_id, name(connection_id), operation_id, name(operation_id)])
+    return rows
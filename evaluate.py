@@ -1,253 +1,135 @@
-import re 
+import os
+import shutil
+import tempfile
+from collections import deque
+from itertools import groupby, islice, chain
+from contextlib import nullcontext
+
+from models import MAIN_RESULT_HEADER, ProcessSummary, ShapeRow, read_metadata_lines, iter_data_lines, rows_to_csv
+from category_rules import category_rules, CONNECTOR_TYPE_PATTERN, PROCESS_ID_PATTERN
+from evaluation_memo import evaluation_memo, fingerprint_lines
+from process_pools import spawn_pool
+
+# Worker processes for sharded evaluation; 1 keeps everything in-process
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "1"))
+# Inputs with fewer rows than this are evaluated serially even with workers
+EVALUATION_PARALLEL_MIN_ROWS = int(os.getenv("EVALUATION_PARALLEL_MIN_ROWS", "200000"))
+# Rows (whole components) handed to a worker at a time
+EVALUATION_SHARD_ROWS = int(os.getenv("EVALUATION_SHARD_ROWS", "20000"))
+# Longest line accepted from an uploaded CSV; files are read at most this much at a time
+MAX_CSV_LINE_KB = int(os.getenv("MAX_CSV_LINE_KB", "1024"))
+MAX_CSV_LINE_BYTES = MAX_CSV_LINE_KB * 1024
+
+# A process takes the most demanding category among its shapes
+CATEGORY_RANK = {"Migrate": 0, "Adapt": 1, "Evaluate": 2}
+RANK_CATEGORY = ["Migrate", "Adapt", "Evaluate"]
 
 # Evaluate Process
 # --- Step 1: Categorize Processes ---
-def categorizeProcesses(csv_input):
-    migrateShapes = ["message", "processcall", "processroute", "Xslt Transformation", "zip", 
-                     "Unzip", "dataprocess", "Base64 Decode", "Base64 Encode", "Pgp Encrypt", 
-                     "pgp Decrypt", "Split Documents", "branch", "route", "start", "noaction:", 
-                     "stop", "trycatch", "catcherrors", "dataprocess", "returndocuments"]
-    adaptShapes = ["setproperties", "map", "cache", "flowcontrol", "Character Decode", 
-                   "Character Encode", "Combine Documents", "Search/Replace", "Custom Scripting", 
-                   "customscripting", "documentproperties", "dynamicdocumentproperties", 
-                   "processproperties", "dynamicprocessproperties", "notify", "decision", "exception"]
-    migrateConnectors = ["ftp", "sftp", "http", "mail", "odata", "rest", 
-                         "salesforceconnector", "wssoapclientsdk"]
-    adaptConnectors = ["disk", "successfactorsmaster-Q2Q93V-SFSF-priv_prod"]
-    
-    lines = csv_input.split('\n')
-    header = lines[0]
-    result = ["Category," + header]
-    
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        row = line.split(',')
-        shapeType = row[3].strip() if len(row) > 3 else ""
-        configuration = ','.join(row[4:]) if len(row) > 4 else ""
-        category = "Evaluate"
-        
-        if shapeType in ["connectoraction", "start"]:
-            connectorType = extractConnectorType(configuration)
-            if connectorType and connectorType in migrateConnectors:
-                category = "Migrate"
-            elif connectorType and connectorType in adaptConnectors:
-                category = "Adapt"
-            elif shapeType == "start" and "connectoraction" not in line:
-                category = "Migrate"
-        elif shapeType == "dataprocess":
-            nameMatch = re.search(r'@name:([^,]+)', configuration)
-            if nameMatch:
-                name = nameMatch.group(1).strip()
-                if name in migrateShapes:
-                    category = "Migrate"
-                elif name in adaptShapes:
-                    category = "Adapt"
-        elif shapeType in migrateShapes:
-            category = "Migrate"
-        elif shapeType in adaptShapes:
-            category = "Adapt"
-        result.append(f"{category},{line}")
-    return '\n'.join(result)
+# Rules live in category_rules; each row costs a few dict lookups
+def categorize_row(row):
+    return category_rules.categorize(row)
+
+# Sets .category on every ShapeRow and returns the rows
+def categorizeProcesses(rows):
+    categorized = []
+    for row in rows:
+        row.category = categorize_row(row)
+        categorized.append(row)
+    return categorized
 
 def extractConnectorType(configuration):
-    connectorTypeMatch = re.search(r'@connectorType\s*:\s*([^,\s]+)', configuration)
+    connectorTypeMatch = CONNECTOR_TYPE_PATTERN.search(configuration)
     return connectorTypeMatch.group(1) if connectorTypeMatch else None
 
 # Make Main Report
 # --- Step 2: Group By Component/Process ---
-def evaluateProcesses(csvInput):
-    lines = csvInput.split('\n')
-    header = lines[0]
-    datalines = lines[1:]
-
+# Returns one ProcessSummary per component, in first-seen order
+def evaluateProcesses(rows):
     groupedMap = {}
-
-    for line in datalines:
-        row = line.split(',')
-        category  = row[0].strip()
-        componentId = row[1].strip()
-        processName = row[2].strip()
-
-        if componentId not in groupedMap:
-            groupedMap[componentId] = {
-                'componentId': componentId,
-                'processName': processName,
-                'categories': []
-            }
-        groupedMap[componentId]['categories'].append(category)
-
-    for key, value in groupedMap.items():
-        categories = value['categories']
-        if "Evaluate" in categories:
-            value['finalCategory'] = "Evaluate"
-        elif "Adapt" in categories:
-            value['finalCategory'] = "Adapt"
-        else:
-            value['finalCategory'] = "Migrate"
-        # Debug print
-        # print(f"Determined final category for {key}: {value['finalCategory']}")
-
-    # Build result CSV
-    result_lines = ["ComponentId,ProcessName,Category"]
-    for key, value in groupedMap.items():
-        result_lines.append(f"{value['componentId']},{value['processName']},{value['finalCategory']}")
-
-    return '\n'.join(result_lines)
+    for row in rows:
+        add_to_group(groupedMap, row)
+    return finish_groups(groupedMap)
+
+def add_to_group(groupedMap, row):
+    componentId = row.component_id.strip()
+    rank = CATEGORY_RANK[row.category]
+    group = groupedMap.get(componentId)
+    if group is None:
+        groupedMap[componentId] = [ProcessSummary(componentId, (row.process_name or "").strip()), rank]
+    elif rank > group[1]:
+        group[1] = rank
+
+def finish_groups(groupedMap):
+    summaries = []
+    for summary, rank in groupedMap.values():
+        summary.category = RANK_CATEGORY[rank]
+        summaries.append(summary)
+    return summaries
 
 # Count Shape Type
 # --- Step 3: Count Shape Types ---
-def count_shape_type(csv_input):
+# The key a row is counted under, or None when it is not counted.
+# Rows without a Configuration column are not counted; the configuration is
+# only searched when it spans more than one comma-separated column
+def shape_count_key(row):
+    if row.configuration is None:
+        return None
+    shape_type = row.shape_type.strip()
+    if shape_type == "connectoraction" or shape_type == "start":
+        if "," in row.configuration:
+            connector_type = extractConnectorType(row.configuration)
+            if connector_type:
+                shape_type = connector_type.strip()
+    return shape_type
+
+def count_shape_type(rows):
     """
-    Type,Count,Alternative
-    start,1,start
-    ftp,1,ftp
-    map,1,messageMapping
-    mail,1,mail
-    stop,1,end
-    sftp,1,sftp
-    decision,1,router
-    processcall,2,processCall
+    [["Type", "Count", "Alternative"],
+     ["start", 1, "start"],
+     ["ftp", 1, "ftp"],
+     ["map", 1, "messageMapping"],
+     ["processcall", 2, "processCall"]]
     """
-    lines = csv_input.split('\n')
-
-    # Initialize a dictionary to count shape types
     shape_type_counts = {}
-
-    # Define the shapes_mappings
-    shapes_mappings = {
-        "disk": "sftp",
-        "map": "messageMapping",
-        "message": "contentModifier",
-        "processcall": "processCall",
-        "processroute": "router",
-        "Base64 Decode": "base64Decoder",
-        "Base64 Encode": "base64Encoder",
-        "Character Decode": "groovyScript",
-        "Character Encode": "groovyScript",
-        "Combine Documents": "gather",
-        "Custom Scripting": "groovyScript",
-        "Search/Replace": "messageMapping",
-        "Split Documents": "generalSplitter",
-        "Mapjsontomultipartformdatamime": "groovyScript",
-        "Mapmultipartformdatamimetojson": "groovyScript",
-        "Pgp Encrypt": "pgpEncryptor",
-        "Pgp Decrypt": "pgpDecryptor",
-        "Xslt Ttransformation": "xsltMapping",
-        "Zip": "zipCompression",
-        "Unzip": "zipDecompression",
-        "branch": "sequentialMulticast",
-        "route": "router",
-        "decision": "router",
-        "start": "start",
-        "stop": "end",
-        "catcherrors": "exceptionSubprocess",
-        "exception": "exceptionSubprocess",
-        "setproperties": "contentModifier",
-        "cache": "data store",
-        "flowcontrol": "splitter/multicast/gather",
-        "businessrules": "routers/validators",
-        "diskconnector": "sftp",
-        "customscripting": "groovyScript",
-        "documentproperties": "contentModifier",
-        "dynamicdocumentproperties": "groovyScript",
-        "processproperties": "contentModifier",
-        "dynamicprocessproperties": "groovyScript",
-        "ftp": "ftp",
-        "sftp": "sftp",
-        "http": "http",
-        "mail": "mail",
-        "odata": "odata",
-        "rest": "http",
-        "salesforce": "salesforce",
-        "netsuite": "netsuite",
-        "successfactors": "successfactors",
-        "successfactorsmaster-Q2Q93V-SFSF-priv_prod": "successfactors",
-        "wssoapclientsdk": "soap",
-        "cleanse": "NA",
-        "programcommand": "groovyScript",
-        "aws": "openConnector",
-        "findchanges": "messageMapping",
-        "dataprocess": "Base64-Encode/Decode/Spiltter/zip-unzip/encrypt-decrypt/xslt",
-        "returndocuments": "end",
-        "notify": "groovy script with mpl logs"
-    }
-
-    # Skip the header and process each line
-    for line in lines[1:]:
-        if not line.strip():
-            continue
-        row = line.split(',')
-        # Check if the row has at least 6 elements (index 4 is shapeType, 5+ is configuration)
-        # Assuming your CSV is: ...shapeType,configuration,...
-        # Actually, in your Groovy code, row[4] is shapeType, row[5..-1] is configuration
-        if len(row) >= 5:
-            shape_type = row[3].strip()
-            configuration = ','.join(row[4:]) if len(row) > 5 else ""
-            
-            # Handle `connectoraction` shape type
-            if shape_type == "connectoraction":
-                connector_type_match = re.search(r'@connectorType:([^,\s]+)', configuration)
-                if connector_type_match:
-                    shape_type = connector_type_match.group(1).strip()
-            
-            # Handle `start` shape type
-            elif shape_type == "start":
-                connector_type_match = re.search(r'@connectorType:([^,\s]+)', configuration)
-                if connector_type_match:
-                    shape_type = connector_type_match.group(1).strip()
-            
-            # Increment the count for the shape type
+    for row in rows:
+        shape_type = shape_count_key(row)
+        if shape_type is not None:
             shape_type_counts[shape_type] = shape_type_counts.get(shape_type, 0) + 1
+    return shape_count_table(shape_type_counts)
 
-    # Build the summary CSV
-    result = ["Type,Count,Alternative"]
-    for shape_type, count in shape_type_counts.items():
-        alternative = shapes_mappings.get(shape_type, "NA")
-        result.append(f"{shape_type},{count},{alternative}")
-    
-    return '\n'.join(result)
+def shape_count_table(shape_type_counts):
+    result = [["Type", "Count", "Alternative"]]
+    alternatives = category_rules.alternatives_for(list(shape_type_counts))
+    for (shape_type, count), alternative in zip(shape_type_counts.items(), alternatives):
+        result.append([shape_type, count, alternative])
+    return result
 
 # Calculate Statistics
 # --- Step 4: Calculate Statistics ---
-def calculate_statistics(csv_input):
+def calculate_statistics(summaries):
     """
-    Category,Count,Percentage
-    Adapt,2,100.00%
-    Evaluate,0,0.00%
-    Migrate,0,0.00%
+    [["Category", "Count", "Percentage"],
+     ["Adapt", 2, "100.00%"],
+     ["Evaluate", 0, "0.00%"],
+     ["Migrate", 0, "0.00%"]]
     """
-    # Split into lines, remove empty/whitespace-only lines
-    lines = [line.strip() for line in csv_input.split('\n') if line.strip()]
-    if not lines:
-        return "Category,Count,Percentage\nNo Data,0,0.00%"
-
-    header = lines[0]
-
-    # Skip header
-    data_lines = lines[1:]
-
     # Map to count each category
     category_count_map = {"Adapt":0, "Evaluate":0, "Migrate":0}
 
-    for line in data_lines:
-        if not line.strip():
-            continue
-        row = line.split(',')
-        if len(row) > 2:
-            category = row[2].strip()
-            category_count_map[category] = category_count_map.get(category, 0) + 1       
+    for summary in summaries:
+        category_count_map[summary.category] = category_count_map.get(summary.category, 0) + 1       
 
     # Total number of processes
-    total_count = len(data_lines)
+    total_count = len(summaries)
 
-    # Build result lines
-    result_lines = ["Category,Count,Percentage"]
+    # Build result rows
+    result = [["Category", "Count", "Percentage"]]
     for category, count in category_count_map.items():
-        percentage = (count / total_count) * 100
-        result_lines.append(f"{category},{count},{percentage:.2f}%")
+        percentage = (count / total_count) * 100 if total_count else 0
+        result.append([category, count, f"{percentage:.2f}%"])
 
-    return '\n'.join(result_lines)
+    return result
 
 
 # Make PDFfrom reportlab.lib import colors
@@ -257,7 +139,10 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet
 from datetime import datetime
 import csv
-from io import StringIO
+import json
+import hashlib
+from io import StringIO, BytesIO
+from artifact_store import artifact_store, RowChunks, iter_part_rows
 
 def ensure_table_data(table_data):
     """Convert input to list of lists (required for ReportLab tables)"""
@@ -276,25 +161,286 @@ def ensure_table_data(table_data):
     else:
         raise ValueError("Unsupported input type for table data")
 
-def calculate_subprocess_summary(csv_text):
-    lines = csv_text.strip().split("\n")
+# The processcall target of a row, or None
+def get_subprocess_id(row):
+    configuration = row.configuration or ""
+    if "processcall" not in configuration:
+        return None
+    match = PROCESS_ID_PATTERN.search(configuration)
+    return match.group(1).strip() if match else None
+
+def calculate_subprocess_summary(rows):
     component_ids = set()
     subprocess_ids = set()
 
-    for line in lines:
-        columns = line.split(",")
-        if columns:
-            component_ids.add(columns[0].strip())
-        if "processcall" in line:
-            match = re.search(r"@processId:([^\s,]+)", line)
-            if match:
-                subprocess_ids.add(match.group(1).strip())
-
-    total = len(component_ids) - 1
-    sub = len(subprocess_ids)
+    for row in rows:
+        component_ids.add(row.component_id.strip())
+        subprocess_id = get_subprocess_id(row)
+        if subprocess_id:
+            subprocess_ids.add(subprocess_id)
+
+    return subprocess_summary_table(len(component_ids), len(subprocess_ids))
+
+def subprocess_summary_table(total, sub):
     main = total - sub
     return [["Total Processes","Main Processes","Sub-Processes"],[total,main,sub]]
 
+
+# --- Single pass ---
+# Reads every metadata line once and updates all the aggregates in the same loop.
+# full_rows, when given, gets the full evaluation row of every line (see full_row)
+# through append() as soon as it is categorized, so the caller can write it out
+# without the lines ever being held in memory.
+# With a memo, each run of consecutive lines of one component is fingerprinted
+# and a component seen before with the same lines reuses its cached result, so
+# only new or changed components go through the rules.
+# Inputs of at least EVALUATION_PARALLEL_MIN_ROWS lines are sharded across
+# EVALUATION_WORKERS processes.
+# Returns (summaries, shape_data, sub_process)
+def evaluate_lines(lines, full_rows=None, memo=None, workers=None):
+    workers = EVALUATION_WORKERS if workers is None else workers
+    lines = iter(lines)
+    if workers > 1:
+        head = list(islice(lines, EVALUATION_PARALLEL_MIN_ROWS))
+        lines = chain(head, lines)
+        if len(head) == EVALUATION_PARALLEL_MIN_ROWS:
+            # Workers read their shards from a file, so the lines are spooled to one first
+            fd, path = tempfile.mkstemp(prefix="boomi-evaluate-", suffix=".csv")
+            try:
+                with open(fd, "w", encoding="utf-8", newline="") as f:
+                    for line in lines:
+                        f.write(line + "\n")
+                return evaluate_file_sharded(path, 0, full_rows, memo, workers)
+            finally:
+                os.remove(path)
+
+    totals = new_totals()
+    evaluate_components(lines, totals, memo, None if full_rows is None else full_rows.append)
+    return finish_totals(totals)
+
+# Same as evaluate_lines, over the data lines of a CSV file from byte offset start
+# on (just past its header). A large file is sharded by byte range, so this
+# process never reads it.
+def evaluate_file(path, start=0, full_rows=None, memo=None, workers=None):
+    workers = EVALUATION_WORKERS if workers is None else workers
+    if workers > 1:
+        rows = (os.path.getsize(path) - start) // line_bytes(path, start)
+        if rows >= EVALUATION_PARALLEL_MIN_ROWS:
+            return evaluate_file_sharded(path, start, full_rows, memo, workers)
+    with open(path, "rb") as f:
+        f.seek(start)
+        lines = iter_data_lines(line.decode("utf-8") for line in iter_file_lines(f))
+        return evaluate_lines(lines, full_rows, memo, workers=1)
+
+# Lines of a binary file, none of which is read past MAX_CSV_LINE_BYTES
+def iter_file_lines(f):
+    while True:
+        line = read_line(f)
+        if not line:
+            return
+        yield line
+
+def read_line(f):
+    line = f.readline(MAX_CSV_LINE_BYTES + 1)
+    check_line_length(line)
+    return line
+
+def check_line_length(line):
+    if len(line) > MAX_CSV_LINE_BYTES:
+        raise ValueError(f"The CSV has a line longer than {MAX_CSV_LINE_KB} KB; "
+                         f"is it a process metadata CSV?")
+
+# The row of the full evaluation for one metadata line
+def full_row(category, line):
+    return [category] + line.split(",", 4)
+
+def line_component_id(line):
+    return line.split(",", 1)[0].strip()
+
+# Evaluates each run of consecutive lines of one component (from the memo when it
+# has them) and folds it into totals; on_row gets the full row of every line
+def evaluate_components(lines, totals, memo=None, on_row=None):
+    version = category_rules.version
+    for component_id, segment in groupby(lines, key=line_component_id):
+        segment = list(segment)
+        key = fingerprint_lines(segment, version) if memo is not None else None
+        result = memo.get(key) if memo is not None else None
+        if result is None:
+            result = evaluate_segment([ShapeRow.from_line(line) for line in segment])
+            if memo is not None:
+                memo.put(key, result)
+        if on_row is not None:
+            for line, category in zip(segment, result[0]):
+                on_row(full_row(category, line))
+        merge_segment(totals, component_id, ShapeRow.from_line(segment[0]).process_name, result)
+
+# Running aggregates: component groups, shape counts, subprocess ids
+def new_totals():
+    return {}, {}, set()
+
+# Folds one component run into the totals, in input order, so the tables come
+# out exactly as if every row had been visited one by one
+def merge_segment(totals, component_id, process_name, result):
+    groupedMap, shape_type_counts, subprocess_ids = totals
+    _, rank, counts, segment_subprocess_ids = result
+    group = groupedMap.get(component_id)
+    if group is None:
+        groupedMap[component_id] = [ProcessSummary(component_id, (process_name or "").strip()), rank]
+    elif rank > group[1]:
+        group[1] = rank
+    for shape_type, count in counts:
+        shape_type_counts[shape_type] = shape_type_counts.get(shape_type, 0) + count
+    subprocess_ids.update(segment_subprocess_ids)
+
+# Folds the totals of a later part of the input into totals, keeping first-seen order
+def merge_totals(totals, later):
+    groupedMap, shape_type_counts, subprocess_ids = totals
+    later_groups, later_counts, later_subprocess_ids = later
+    for component_id, (summary, rank) in later_groups.items():
+        group = groupedMap.get(component_id)
+        if group is None:
+            groupedMap[component_id] = [summary, rank]
+        elif rank > group[1]:
+            group[1] = rank
+    for shape_type, count in later_counts.items():
+        shape_type_counts[shape_type] = shape_type_counts.get(shape_type, 0) + count
+    subprocess_ids.update(later_subprocess_ids)
+
+def finish_totals(totals):
+    groupedMap, shape_type_counts, subprocess_ids = totals
+    summaries = finish_groups(groupedMap)
+    return summaries, shape_count_table(shape_type_counts), subprocess_summary_table(len(summaries), len(subprocess_ids))
+
+# Categories, highest rank, shape counts (first-seen order) and subprocess ids
+# of one component's rows; kept immutable so it can be shared through the memo
+def evaluate_segment(segment):
+    categories = []
+    rank = 0
+    counts = {}
+    subprocess_ids = set()
+    for row in segment:
+        category = categorize_row(row)
+        categories.append(category)
+        rank = max(rank, CATEGORY_RANK[category])
+
+        shape_type = shape_count_key(row)
+        if shape_type is not None:
+            counts[shape_type] = counts.get(shape_type, 0) + 1
+
+        subprocess_id = get_subprocess_id(row)
+        if subprocess_id:
+            subprocess_ids.add(subprocess_id)
+    return tuple(categories), rank, tuple(counts.items()), frozenset(subprocess_ids)
+
+# --- Sharded ---
+# A large file is cut into byte ranges of whole component runs (a component is
+# never split across workers). Each worker reads its own range, evaluates it,
+# writes the full rows to a table part of its own and returns the part's layout
+# with the totals of its range; this process only finds the range boundaries,
+# merges the totals and appends the parts, strictly in input order, so the
+# output is identical to the serial path. With a memo, each worker consults its
+# own process's evaluation_memo. At most two ranges per worker are in flight,
+# which bounds the parts waiting on disk.
+
+# Average bytes per line over the first lines from start
+def line_bytes(path, start, sample=1000):
+    with open(path, "rb") as f:
+        f.seek(start)
+        lengths = [len(line) for line in islice(iter_file_lines(f), sample)]
+    return max(1, sum(lengths) // max(1, len(lengths)))
+
+# (start, end) byte ranges of about shard_bytes each, ending where the component
+# id changes, so every run of a component's lines stays in one range
+def iter_shard_ranges(path, start, shard_bytes):
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + shard_bytes
+            if end >= size:
+                yield start, size
+                return
+            # Finish the line the cut falls in, then the run of the component after it
+            f.seek(end - 1)
+            read_line(f)
+            component_id = None
+            while True:
+                end = f.tell()
+                line = read_line(f)
+                if not line:
+                    break
+                line = line.decode("utf-8")
+                if not line.strip():
+                    continue
+                if component_id is None:
+                    component_id = line_component_id(line)
+                elif line_component_id(line) != component_id:
+                    break
+            yield start, end
+            start = end
+
+def evaluate_file_sharded(path, start=0, full_rows=None, memo=None, workers=None, shard_rows=None):
+    workers = workers or EVALUATION_WORKERS
+    shard_bytes = (shard_rows or EVALUATION_SHARD_ROWS) * line_bytes(path, start)
+    rules = (category_rules.version, category_rules.shapes, category_rules.connectors)
+    totals = new_totals()
+    pending = deque()
+    part_dir = tempfile.mkdtemp(prefix="boomi-evaluate-") if full_rows is not None else None
+
+    def drain():
+        part_path, future = pending.popleft()
+        shard_totals, layout = future.result()
+        merge_totals(totals, shard_totals)
+        if part_path is not None:
+            # A table writer takes the part as it is; other sinks get its rows
+            if hasattr(full_rows, "append_part"):
+                full_rows.append_part(part_path, layout)
+            else:
+                for row in iter_part_rows(part_path, layout):
+                    full_rows.append(row)
+            os.remove(part_path)
+
+    try:
+        with spawn_pool("evaluate", workers) as pool:
+            for index, (shard_start, shard_end) in enumerate(iter_shard_ranges(path, start, shard_bytes)):
+                part_path = os.path.join(part_dir, f"{index}.part") if part_dir else None
+                future = pool.submit(evaluate_shard, path, shard_start, shard_end, rules, part_path, memo is not None)
+                pending.append((part_path, future))
+                while len(pending) > workers * 2:
+                    drain()
+            while pending:
+                drain()
+    finally:
+        if part_dir:
+            shutil.rmtree(part_dir, ignore_errors=True)
+    return finish_totals(totals)
+
+# Runs in a worker process: the parent's rules are installed first so rules
+# added at runtime apply to the shards too. Returns the totals of the range and
+# the layout of the table part written to part_path (None without one).
+def evaluate_shard(path, start, end, rules, part_path=None, use_memo=False):
+    version, shapes, connectors = rules
+    if category_rules.version != version or category_rules.shapes != shapes:
+        category_rules.shapes = shapes
+        category_rules.connectors = connectors
+        category_rules.version = version
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    lines = data.split(b"\n")
+    for line in lines:
+        check_line_length(line)
+    lines = iter_data_lines(line.decode("utf-8") for line in lines)
+    memo = evaluation_memo if use_memo else None
+    totals = new_totals()
+    if part_path is None:
+        evaluate_components(lines, totals, memo)
+        return totals, None
+    with open(part_path, "wb") as part:
+        chunks = RowChunks(part)
+        evaluate_components(lines, totals, memo, chunks.append)
+        return totals, chunks.layout()
+
 def build_pdf(filename, shape_data, category_data, sub_process):
     doc = SimpleDocTemplate(filename, pagesize=A4)
     styles = getSampleStyleSheet()
@@ -379,32 +525,88 @@ def build_pdf(filename, shape_data, category_data, sub_process):
 
     doc.build(elements)
 
-# --- MAIN WORKFLOW ---
-def run_evaluation(csv_input):
-    # Step 2: Categorize processes
-    fullEvaluation = categorizeProcesses(csv_input)
-    with open("fullEvaluation.csv", mode='w', encoding='utf-8', newline='') as f:
-        f.write(fullEvaluation)
-
-    # Step 3: Group by process
-    mainResult = evaluateProcesses(fullEvaluation)
-    with open("mainResult.csv", mode='w', encoding='utf-8') as f:
-        f.write(mainResult)
-
-    # Step 4: Count shapes
-    shape_data = count_shape_type(csv_input)
-
-    # Step 5: Calculate statistics
-    category_data = calculate_statistics(mainResult)
-
-    # Step 6: Calculate subprocess summary
-    sub_process = calculate_subprocess_summary(csv_input)
+# --- Lazy PDF ---
+# Rendered PDFs are kept in the artifact store under a hash of the report
+# inputs and the report date, so identical evaluations share one rendering
+REPORT_CACHE_OWNER = "report-cache"
+
+def report_digest(report, date=None):
+    date = date or datetime.now().strftime('%d-%m-%Y')
+    payload = json.dumps([report["shape_data"], report["category_data"], report["sub_process"], date])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def report_pdf(report):
+    """PDF bytes for the report inputs returned by run_evaluation, rendered at most once per content."""
+    artifact_id = "report-" + report_digest(report)
+    pdf_data = artifact_store.get(artifact_id)
+    if pdf_data is None:
+        buffer = BytesIO()
+        build_pdf(buffer, report["shape_data"], report["category_data"], report["sub_process"])
+        pdf_data = buffer.getvalue()
+        artifact_store.put(pdf_data, REPORT_CACHE_OWNER, artifact_id=artifact_id,
+                           name="Result.pdf", mimetype="application/pdf")
+    return pdf_data
 
-    # Step 7: Generate PDF report
-    pdf_filename = "Migration_Assessment_Report.pdf"
-    build_pdf(pdf_filename, shape_data, category_data, sub_process)
-
-    return "fullEvaluation.csv", "mainResult.csv", pdf_filename
+# --- MAIN WORKFLOW ---
+# stage, when given, is a context manager factory used to time each step: stage(name)
+# Results are returned rather than written to shared files, so concurrent
+# evaluations never share files:
+#   {"full_header", "full_rows", "main_header", "main_rows", "report"}
+# Rows are lists of strings; report holds the PDF inputs (see report_pdf).
+# full_rows is where the full evaluation goes, one row per input line: a list
+# by default, or anything with append(), such as an artifact TableWriter that
+# keeps a big evaluation on disk instead of in memory.
+# With output_dir the CSVs and the rendered PDF are also written there.
+# memo defaults to the worker's evaluation_memo; None evaluates every component.
+# csv_input is CSV text, an iterable of lines, or the path (os.PathLike) of a
+# CSV file, which large evaluations shard by byte range without reading it here.
+def run_evaluation(csv_input, stage=None, output_dir=None, full_rows=None, memo=evaluation_memo):
+    stage = stage or (lambda name: nullcontext())
+    full_rows = [] if full_rows is None else full_rows
+
+    # Step 1: Categorize, group, count and collect subprocesses in one pass,
+    # collecting each categorized row for the full evaluation as it goes;
+    # components unchanged since an earlier run come from the memo
+    with stage("evaluate"):
+        if isinstance(csv_input, os.PathLike):
+            with open(csv_input, "rb") as f:
+                header = read_line(f).decode("utf-8").rstrip("\r\n").split(",")
+                start = f.tell()
+            summaries, shape_data, sub_process = evaluate_file(csv_input, start, full_rows, memo)
+        else:
+            header, lines = read_metadata_lines(csv_input)
+            summaries, shape_data, sub_process = evaluate_lines(lines, full_rows, memo)
+
+    # Step 2: Main result and statistics from the per-process summaries
+    with stage("summarize"):
+        main_rows = [summary.fields() for summary in summaries]
+        category_data = calculate_statistics(summaries)
+
+    # Step 3: The PDF report is only rendered when it is first downloaded,
+    # see report_pdf; hand back what it is built from
+    report = {"shape_data": shape_data, "category_data": category_data, "sub_process": sub_process}
+
+    result = {
+        "full_header": ["Category"] + header,
+        "full_rows": full_rows,
+        "main_header": MAIN_RESULT_HEADER,
+        "main_rows": main_rows,
+        "report": report,
+    }
+    if output_dir:
+        with stage("save"):
+            save_evaluation(result, output_dir)
+    return result
+
+# Writes fullEvaluation.csv, mainResult.csv and Migration_Assessment_Report.pdf into output_dir
+def save_evaluation(result, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "fullEvaluation.csv"), mode='w', encoding='utf-8', newline='') as f:
+        f.write(rows_to_csv(result["full_header"], result["full_rows"], "\n"))
+    with open(os.path.join(output_dir, "mainResult.csv"), mode='w', encoding='utf-8', newline='') as f:
+        f.write(rows_to_csv(result["main_header"], result["main_rows"], "\n"))
+    with open(os.path.join(output_dir, "Migration_Assessment_Report.pdf"), mode='wb') as f:
+        f.write(report_pdf(result["report"]))
 
 
 """
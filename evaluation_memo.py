@@ -0,0 +1,76 @@
+# evaluation_memo.py
+# Memo of per-component evaluation results, keyed by a fingerprint of the rows.
+#
+# Consultants resubmit nearly the same metadata CSV many times; a component
+# whose rows (and the categorization rules) have not changed since the last
+# run gets its categories and counts back from here instead of re-running the
+# rules. Entries are evicted least recently used first.
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Number of component results kept per worker process, 0 disables the memo
+EVALUATION_MEMO_SIZE = int(os.getenv("EVALUATION_MEMO_SIZE", "50000"))
+
+
+def fingerprint_lines(lines, rules_version):
+    """Digest of a component's lines, as they appear in the CSV, under a rules version."""
+    digest = hashlib.blake2b(str(rules_version).encode("utf-8"), digest_size=16)
+    for line in lines:
+        digest.update(b"\n")
+        digest.update(line.encode("utf-8"))
+    return digest.digest()
+
+
+class ComponentMemo:
+    """
+    LRU map of results, bounded by entry count and, when max_bytes is set, by the
+    total sizeof(result) of its entries.
+    """
+
+    def __init__(self, max_entries=EVALUATION_MEMO_SIZE, max_bytes=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        if self.max_entries <= 0:
+            return
+        size = self.sizeof(result) if self.sizeof is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (result, size)
+            self.bytes += size
+            while (len(self._entries) > self.max_entries
+                   or self.max_bytes is not None and self.bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = self.misses = 0
+
+
+evaluation_memo = ComponentMemo()
@@ -0,0 +1,163 @@
+# export_archive.py
+# Compressed archives of the raw component exports of a run, and replay from them.
+#
+# With BOOMI_EXPORT_ARCHIVE_DIR set, every extract/migrate run writes the XML
+# of each exported component into its own ZIP there. Writes are queued to a
+# background thread so the export loop only waits on compression when too many
+# exports are queued, and a failed write is raised rather than lost. An archive
+# can be handed back to extract/migration get_all_data as replay=..., which
+# then reads components from it instead of calling the API.
+#
+#   python export_archive.py archive.zip                 # metadata CSV of the archived run
+#   python export_archive.py archive.zip --migration     # migration preview CSV
+#   python export_archive.py archive.zip --subprocesses  # also crawl processcall targets
+import os
+import sys
+import json
+import time
+import secrets
+import zipfile
+import argparse
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Opt-in: directory for per-run archives, unset disables archiving
+EXPORT_ARCHIVE_DIR = os.getenv("BOOMI_EXPORT_ARCHIVE_DIR")
+
+MANIFEST_NAME = "manifest.json"
+# Component exports queued for compression per archive; add() waits beyond this
+EXPORT_ARCHIVE_MAX_PENDING = 64
+
+# One writer thread for all archives keeps compression off the export threads
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-archive")
+
+
+class ExportArchive:
+    """
+    Write side: add() queues a component export, close() writes the manifest and
+    waits. Both raise the error of a failed write.
+    """
+
+    def __init__(self, path, account_id=None, roots=(), max_pending=EXPORT_ARCHIVE_MAX_PENDING):
+        self.path = path
+        self.account_id = account_id
+        self.roots = list(roots)
+        self.max_pending = max_pending
+        self._components = {}
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+
+    def add(self, component_id, version, xml_data):
+        if not xml_data:
+            return
+        with self._lock:
+            if component_id in self._components:
+                return
+            member = f"components/{component_id}.xml"
+            self._components[component_id] = {"version": version, "member": member}
+            self._pending.append(_writer.submit(self._zip.writestr, member, xml_data))
+            oldest = self._pending.popleft() if len(self._pending) > self.max_pending else None
+        if oldest is not None:
+            oldest.result()
+
+    def close(self):
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, deque()
+            for future in pending:
+                future.result()
+            manifest = {
+                "account_id": self.account_id,
+                "created": time.time(),
+                "roots": self.roots,
+                "components": self._components,
+            }
+            _writer.submit(self._zip.writestr, MANIFEST_NAME, json.dumps(manifest, indent=2)).result()
+        finally:
+            _writer.submit(self._zip.close).result()
+
+
+class ExportArchiveReader:
+    """Replay side: serves exports from an archive in place of the Boomi API."""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+        manifest = json.loads(self._zip.read(MANIFEST_NAME))
+        self.account_id = manifest.get("account_id")
+        self.roots = manifest.get("roots", [])
+        self.components = manifest.get("components", {})
+
+    def component_ids(self):
+        return list(self.components)
+
+    def versions(self, component_ids):
+        return {cid: self.components[cid]["version"] for cid in component_ids if cid in self.components}
+
+    def get(self, component_id):
+        entry = self.components.get(component_id)
+        if entry is None:
+            print("Not in archive:", component_id, file=sys.stderr)
+            return None
+        with self._lock:
+            return self._zip.read(entry["member"]).decode("utf-8")
+
+    def close(self):
+        self._zip.close()
+
+
+# A new archive for this run when archiving is enabled, else None
+def open_run_archive(account_id, roots):
+    if not EXPORT_ARCHIVE_DIR:
+        return None
+    os.makedirs(EXPORT_ARCHIVE_DIR, exist_ok=True)
+    name = f"exports-{account_id}-{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}.zip"
+    return ExportArchive(os.path.join(EXPORT_ARCHIVE_DIR, name), account_id, roots)
+
+
+# The archive a run writes to: the one passed in, a new one when archiving is
+# enabled, or None when replaying. Archives opened here are closed at the end.
+@contextmanager
+def run_archive(account_id, roots, archive=None, replay=None):
+    if archive is not None or replay is not None:
+        yield archive
+        return
+    archive = open_run_archive(account_id, roots)
+    try:
+        yield archive
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+# Accepts a reader or a path to an archive
+def open_replay(replay):
+    if isinstance(replay, (str, os.PathLike)):
+        return ExportArchiveReader(replay)
+    return replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run extraction or migration from an export archive")
+    parser.add_argument("archive")
+    parser.add_argument("processes", nargs="*", help="process ids, default: the processes of the archived run")
+    parser.add_argument("--migration", action="store_true", help="print the migration preview instead")
+    parser.add_argument("--subprocesses", action="store_true", help="crawl processcall references")
+    args = parser.parse_args()
+
+    replay = ExportArchiveReader(args.archive)
+    processes = args.processes or replay.roots
+    if args.migration:
+        import migration
+        sys.stdout.write(migration.get_all_data(None, None, replay.account_id, processes, replay=replay))
+    else:
+        import extract
+        sys.stdout.write(extract.get_all_data(None, None, replay.account_id, processes, args.subprocesses, replay=replay))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# export_cache.py
+# Local, content-addressed cache of exported component XML.
+#
+# Exports are keyed by (account, componentId, version). A version of a Boomi
+# component never changes once saved, so an entry never goes stale; the index
+# only points at blobs named by the SHA-256 of their content, which lets
+# identical exports share one file. The cache is bounded by total blob size
+# and evicts the least recently used blobs first.
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+
+CACHE_DIR = os.getenv("BOOMI_EXPORT_CACHE_DIR", ".export_cache")
+# 0 disables the cache entirely
+CACHE_MAX_MB = int(os.getenv("BOOMI_EXPORT_CACHE_MAX_MB", "256"))
+
+
+class ExportCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _connect(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.join(self.directory, "objects"), exist_ok=True)
+                    with closing(sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=30)) as conn, conn:
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS entries ("
+                            "account_id TEXT, component_id TEXT, version TEXT, digest TEXT, "
+                            "PRIMARY KEY (account_id, component_id, version))"
+                        )
+                        conn.execute(
+                            "CREATE TABLE IF NOT EXISTS blobs ("
+                            "digest TEXT PRIMARY KEY, size INTEGER, last_used REAL)"
+                        )
+                    self._initialized = True
+        return sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=30)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def get(self, account_id, component_id, version):
+        if not self.enabled or version is None:
+            return None
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute(
+                    "SELECT digest FROM entries WHERE account_id = ? AND component_id = ? AND version = ?",
+                    (account_id, component_id, str(version))
+                ).fetchone()
+                if row is None:
+                    return None
+                digest = row[0]
+                with open(self._blob_path(digest), "rb") as f:
+                    data = f.read()
+                conn.execute("UPDATE blobs SET last_used = ? WHERE digest = ?", (time.time(), digest))
+            return data.decode("utf-8")
+        except (OSError, sqlite3.Error) as e:
+            print("Export cache read error:", e)
+            return None
+
+    def put(self, account_id, component_id, version, xml_data):
+        if not self.enabled or version is None or not xml_data:
+            return
+        data = xml_data.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            path = self._blob_path(digest)
+            with closing(self._connect()) as conn, conn:
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                conn.execute(
+                    "INSERT OR REPLACE INTO blobs (digest, size, last_used) VALUES (?, ?, ?)",
+                    (digest, len(data), time.time())
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (account_id, component_id, version, digest) VALUES (?, ?, ?, ?)",
+                    (account_id, component_id, str(version), digest)
+                )
+                self._evict(conn)
+        except (OSError, sqlite3.Error) as e:
+            print("Export cache write error:", e)
+
+    # Drops least recently used blobs (and the entries pointing at them) until under budget
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, size in conn.execute("SELECT digest, size FROM blobs ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            try:
+                os.remove(self._blob_path(digest))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+export_cache = ExportCache()
@@ -0,0 +1,82 @@
+# flow_graph.py
+# Execution order of the shapes of one process, from their dragpoint links.
+#
+# Shapes are listed in the export in the order they were dropped on the canvas,
+# not the order they run in. Each shape's dragpoints name the shapes it hands
+# documents to (branch paths, decision true/false, try/catch default/error, in
+# that order), so the process is a graph over shape indexes. The revised
+# sequence is a topological order of that graph from the start shape: a path is
+# followed to its end before the next path of a branch begins, and a shape where
+# paths meet comes after all of them. Shapes no path reaches get no sequence.
+# Everything is iterative and linear in shapes + links.
+
+
+# Target shape names of a shape's dragpoints, in document order
+def shape_targets(shape):
+    dragpoints = shape.get("dragpoints")
+    if not isinstance(dragpoints, dict):
+        return []
+    dragpoint = dragpoints.get("dragpoint")
+    if isinstance(dragpoint, dict):
+        dragpoint = [dragpoint]
+    elif not isinstance(dragpoint, list):
+        return []
+    return [point["@toShape"] for point in dragpoint if isinstance(point, dict) and point.get("@toShape")]
+
+
+def build_adjacency(names, targets):
+    """Links as lists of shape indexes; links to shapes not in the process are dropped."""
+    index = {name: i for i, name in enumerate(names) if name}
+    return [[index[target] for target in shape_targets if target in index] for shape_targets in targets]
+
+
+# Start shapes, or failing that every shape nothing links to, or the first shape
+def find_roots(adjacency, shape_types):
+    roots = [i for i, shape_type in enumerate(shape_types) if shape_type == "start"]
+    if roots:
+        return roots
+    linked = [False] * len(adjacency)
+    for links in adjacency:
+        for target in links:
+            linked[target] = True
+    roots = [i for i, is_linked in enumerate(linked) if not is_linked]
+    if not roots and adjacency:
+        roots = [0]
+    return roots
+
+
+def execution_order(adjacency, roots):
+    """Shape indexes reachable from roots, in topological order (reverse DFS postorder)."""
+    visited = [False] * len(adjacency)
+    postorder = []
+    # Roots and links are pushed in reverse so the first path is finished first
+    # and ends up first once the postorder is reversed
+    for root in reversed(roots):
+        if visited[root]:
+            continue
+        visited[root] = True
+        stack = [(root, iter(reversed(adjacency[root])))]
+        while stack:
+            node, links = stack[-1]
+            for target in links:
+                if not visited[target]:
+                    visited[target] = True
+                    stack.append((target, iter(reversed(adjacency[target]))))
+                    break
+            else:
+                stack.pop()
+                postorder.append(node)
+    postorder.reverse()
+    return postorder
+
+
+def revised_sequence(names, targets, shape_types):
+    """
+    1-based execution position of every shape, None for shapes no path reaches.
+    names, targets (from shape_targets) and shape_types run in document order.
+    """
+    adjacency = build_adjacency(names, targets)
+    sequence = [None] * len(adjacency)
+    for position, node in enumerate(execution_order(adjacency, find_roots(adjacency, shape_types)), 1):
+        sequence[node] = position
+    return sequence
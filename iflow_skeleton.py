@@ -0,0 +1,186 @@
+# iflow_skeleton.py
+# CPI iFlow skeletons for migrated processes, built in worker processes and
+# streamed into one ZIP.
+#
+# A skeleton is an importable iFlow project (MANIFEST.MF, metainfo.prop,
+# parameters.prop and the .iflw BPMN model). It holds one step per reachable
+# Boomi shape in execution order, each named after the shape and annotated
+# with its original type and CPI alternative, so the flow only has to be
+# configured in the designer rather than drawn. Skeletons are built in a pool
+# of spawned processes. Each finished one is written into the download
+# straight away, and only a bounded number are in flight at a time, so an
+# account of hundreds of processes streams in one request with flat memory.
+import io
+import os
+import re
+import time
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+from concurrent.futures import wait, FIRST_COMPLETED
+
+from streaming import iter_zip
+from process_pools import spawn_pool
+
+# Worker processes building skeletons, 1 builds them in the request thread
+IFLOW_WORKERS = int(os.getenv("IFLOW_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Skeletons queued per worker, which bounds memory
+IFLOW_IN_FLIGHT_PER_WORKER = 2
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_]+")
+
+
+def artifact_id(name, component_id):
+    """iFlow ids allow letters, digits and underscores only."""
+    base = _SAFE_NAME.sub("_", name).strip("_") or "Process"
+    suffix = _SAFE_NAME.sub("_", component_id or "").strip("_")
+    return f"{base}_{suffix[:8]}" if suffix else base
+
+
+def _manifest_line(key, value):
+    """One manifest header, continued on lines of a space so none is over 72 bytes (JAR spec)."""
+    # Line breaks in a process name would start a new header
+    value = " ".join(str(value).split())
+    lines = []
+    line = f"{key}: ".encode("utf-8")
+    for char in value:
+        data = char.encode("utf-8")
+        if len(line) + len(data) > 72:
+            lines.append(line)
+            line = b" "
+        line += data
+    lines.append(line)
+    return b"\r\n".join(lines).decode("utf-8") + "\r\n"
+
+
+def _manifest(iflow_id, name):
+    return (
+        "Manifest-Version: 1.0\r\n"
+        "Bundle-ManifestVersion: 2\r\n"
+        + _manifest_line("Bundle-Name", name)
+        + _manifest_line("Bundle-SymbolicName", f"{iflow_id}; singleton:=true")
+        + "Bundle-Version: 1.0.0\r\n"
+        "SAP-BundleType: IntegrationFlow\r\n"
+        "SAP-NodeType: IFLMAP\r\n"
+        "SAP-RuntimeProfile: iflmap\r\n"
+        + _manifest_line("Origin-Bundle-Name", name)
+        + _manifest_line("Origin-Bundle-SymbolicName", iflow_id)
+    )
+
+
+def _property(key, value):
+    return f"<ifl:property><key>{escape(key)}</key><value>{escape(str(value))}</value></ifl:property>"
+
+
+def _iflw(name, steps):
+    nodes = ['<bpmn2:startEvent id="StartEvent_1" name="Start"><bpmn2:outgoing>SequenceFlow_0</bpmn2:outgoing>'
+             '</bpmn2:startEvent>']
+    flows = []
+    previous = "StartEvent_1"
+    for i, (label, original_type, alternative) in enumerate(steps, 1):
+        node_id = f"CallActivity_{i}"
+        flows.append(f'<bpmn2:sequenceFlow id="SequenceFlow_{i - 1}" sourceRef="{previous}" targetRef="{node_id}"/>')
+        nodes.append(
+            f'<bpmn2:callActivity id="{node_id}" name={quoteattr(label or original_type)}>'
+            "<bpmn2:extensionElements>"
+            + _property("componentVersion", "1.0")
+            + _property("activityType", "Script" if alternative == "groovyScript" else "Enricher")
+            + _property("boomiShapeType", original_type)
+            + _property("cpiAlternative", alternative)
+            + "</bpmn2:extensionElements>"
+            f"<bpmn2:incoming>SequenceFlow_{i - 1}</bpmn2:incoming>"
+            f"<bpmn2:outgoing>SequenceFlow_{i}</bpmn2:outgoing>"
+            "</bpmn2:callActivity>"
+        )
+        previous = node_id
+    last = len(steps)
+    flows.append(f'<bpmn2:sequenceFlow id="SequenceFlow_{last}" sourceRef="{previous}" targetRef="EndEvent_1"/>')
+    nodes.append(f'<bpmn2:endEvent id="EndEvent_1" name="End"><bpmn2:incoming>SequenceFlow_{last}</bpmn2:incoming>'
+                 '</bpmn2:endEvent>')
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<bpmn2:definitions xmlns:bpmn2="http://www.omg.org/spec/BPMN/20100524/MODEL" '
+        'xmlns:ifl="http:///com.sap.ifl.model/Ifl.xsd" id="Definitions_1">'
+        '<bpmn2:collaboration id="Collaboration_1" name="Default Collaboration">'
+        "<bpmn2:extensionElements>"
+        + _property("namespaceMapping", "")
+        + _property("httpSessionHandling", "None")
+        + _property("returnExceptionToSender", "false")
+        + _property("log", "All events")
+        + _property("componentVersion", "1.1")
+        + _property("cmdVariantUri", "ctype::IFlowVariant/cname::IFlowConfiguration/version::1.1.16")
+        + "</bpmn2:extensionElements>"
+        f'<bpmn2:participant id="Participant_Process_1" ifl:type="IntegrationProcess" '
+        f'name={quoteattr(name)} processRef="Process_1"/>'
+        "</bpmn2:collaboration>"
+        '<bpmn2:process id="Process_1" name="Integration Process">'
+        "<bpmn2:extensionElements>"
+        + _property("transactionTimeout", "30")
+        + _property("componentVersion", "1.1")
+        + _property("cmdVariantUri", "ctype::FlowElementVariant/cname::IntegrationProcess/version::1.1.3")
+        + _property("transactionalHandling", "Not Required")
+        + "</bpmn2:extensionElements>"
+        + "".join(nodes) + "".join(flows)
+        + "</bpmn2:process></bpmn2:definitions>"
+    )
+
+
+def build_iflow(plan):
+    """
+    The iFlow project ZIP for one plan, {"component_id", "name", "steps"} where
+    steps are [shape label, original type, CPI alternative] in execution order.
+    Returns (file name, ZIP bytes).
+    """
+    name = plan["name"] or plan["component_id"]
+    iflow_id = artifact_id(name, plan["component_id"])
+    metainfo = f"description=Generated from Boomi process {plan['component_id']}\r\n"
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr("META-INF/MANIFEST.MF", _manifest(iflow_id, name))
+        zipf.writestr("metainfo.prop", metainfo)
+        zipf.writestr("src/main/resources/parameters.prop", "")
+        zipf.writestr(f"src/main/resources/scenarioflows/integrationflow/{iflow_id}.iflw",
+                      _iflw(name, plan["steps"]))
+    return f"{iflow_id}.zip", buffer.getvalue()
+
+
+# A finished skeleton as an iter_zip member; it is already compressed, so stored
+def _member(file_name, data):
+    info = zipfile.ZipInfo(file_name, time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_STORED
+    return info, lambda: [data]
+
+
+def iter_iflows(plans, workers=None):
+    """(file name, bytes) per plan, in completion order when built by several workers."""
+    workers = workers or IFLOW_WORKERS
+    if workers <= 1:
+        for plan in plans:
+            yield build_iflow(plan)
+        return
+
+    plans = iter(plans)
+    pending = set()
+    with spawn_pool("iflow", workers) as pool:
+        try:
+            while True:
+                while len(pending) < workers * IFLOW_IN_FLIGHT_PER_WORKER:
+                    plan = next(plans, None)
+                    if plan is None:
+                        break
+                    pending.add(pool.submit(build_iflow, plan))
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            # The download was abandoned or failed: drop the queued builds
+            for future in pending:
+                future.cancel()
+
+
+def iter_iflow_zip(plans, workers=None):
+    """One ZIP holding an iFlow project ZIP per plan, streamed as skeletons finish."""
+    return iter_zip(_member(file_name, data) for file_name, data in iter_iflows(plans, workers))
@@ -0,0 +1,122 @@
+# jobs.py
+# Background execution for the long-running /extract, /migrate and /evaluate work.
+#
+# A submitted job runs on a small thread pool while the browser polls its
+# status. Jobs report per-item progress (one item per process) and how long
+# each named stage took. Changes are saved as a record in the artifact store,
+# so any worker can answer a status poll or serve the finished result.
+import os
+import time
+import uuid
+import threading
+import traceback
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from artifact_store import artifact_store
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Progress updates rewrite the job record at most this often; status and stage
+# changes are always written
+JOB_SAVE_INTERVAL = float(os.getenv("JOB_SAVE_INTERVAL", "0.5"))
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+
+
+class Job:
+    def __init__(self, kind, owner):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.status = "queued"
+        self.created = time.time()
+        self.finished = None
+        self.total = 0
+        self.items = {}
+        self.stages = []
+        self.error = None
+        self.result = None
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._saved = 0.0
+
+    def add_total(self, count):
+        with self._lock:
+            self.total += count
+        self.save()
+
+    def item_done(self, item, ok=True):
+        with self._lock:
+            self.items[item] = "done" if ok else "failed"
+        self.save()
+
+    # A job is its own progress callback: job(item, ok)
+    __call__ = item_done
+
+    @contextmanager
+    def stage(self, name):
+        started = time.time()
+        entry = {"name": name, "seconds": None}
+        with self._lock:
+            self.stages.append(entry)
+        self.save(force=True)
+        try:
+            yield
+        finally:
+            entry["seconds"] = round(time.time() - started, 3)
+            self.save(force=True)
+
+    def to_dict(self):
+        with self._lock:
+            done = sum(1 for status in self.items.values() if status == "done")
+            failed = len(self.items) - done
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "error": self.error,
+                "progress": {"total": self.total, "done": done, "failed": failed, "items": dict(self.items)},
+                "stages": [dict(entry) for entry in self.stages],
+                "elapsed": round((self.finished or time.time()) - self.created, 3),
+            }
+
+    def save(self, force=False):
+        # Snapshot and write under one lock, so an older snapshot never lands last
+        with self._save_lock:
+            now = time.monotonic()
+            if not force and now - self._saved < JOB_SAVE_INTERVAL:
+                return
+            self._saved = now
+            record = self.to_dict()
+            record["result"] = self.result if self.status == "done" else None
+            artifact_store.put(record, self.owner, kind="record", artifact_id=f"job-{self.id}")
+
+
+def _run(job, func, args, kwargs):
+    job.status = "running"
+    job.save(force=True)
+    try:
+        job.result = func(job, *args, **kwargs)
+        job.status = "done"
+    except Exception as e:
+        traceback.print_exc()
+        job.error = str(e)
+        job.status = "failed"
+    finally:
+        job.finished = time.time()
+        job.save(force=True)
+
+
+def submit(kind, owner, func, *args, **kwargs):
+    """Queue func(job, *args, **kwargs) on the job pool and return the Job right away."""
+    job = Job(kind, owner)
+    job.save(force=True)
+    _executor.submit(_run, job, func, args, kwargs)
+    return job
+
+
+def get_job_state(job_id, owner):
+    """Status dict (with "result" once done) for a job owned by owner, from any worker."""
+    if not job_id.isalnum():
+        return None
+    return artifact_store.get(f"job-{job_id}", owner)
@@ -1,79 +1,76 @@
 import io
-import re
-import csv
-import zipfile
-import requests
-from flask import Flask, render_template, send_file, jsonify, request
-
-from evaluate import run_evaluation
-from extract import get_all_processes, extract_process_name_id, get_all_data
+import os
+import secrets
+import pathlib
+import itertools
+from flask import Flask, Response, render_template, stream_template, send_file, jsonify, request, session
+
+import jobs
+from artifact_store import artifact_store, shared_secret_key
+from table_pages import table_views
+from iflow_skeleton import iter_iflow_zip
+from evaluate import run_evaluation, report_pdf
+from boomi_api import QueryError
+from extract import iter_process_pages, iter_process_name_id, get_all_rows
+from models import METADATA_HEADER, MIGRATION_HEADER, CONNECTOR_HEADER, iter_csv_chunks
+from connector_details import connector_details
+from streaming import iter_zip, iter_file_chunks, iter_encoded
 
 app = Flask(__name__)
+app.secret_key = shared_secret_key()
 
-_pdf_cache = None
-_main_csv_cache = None
-_full_csv_cache = None
+# Largest request body accepted, which bounds CSV uploads to /evaluate
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "512"))
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_MB * 1024 * 1024
 
 # -------------------------------------
 # Utilities
 # -------------------------------------
 
-def csv_to_html_table(csv_text):
-    import html
+# Results and jobs belong to the browser session that started them
+def current_owner():
+    return session.setdefault("sid", secrets.token_urlsafe(16))
 
-    try:
-        dialect = csv.Sniffer().sniff(csv_text.splitlines()[0])
-    except csv.Error:
-        dialect = csv.excel
 
-    reader = csv.reader(csv_text.splitlines(), dialect)
-    rows = list(reader)
+# Stores rows as a downloadable CSV table and returns its artifact id
+def store_table(header, rows, name, owner, line_terminator="\r\n"):
+    with artifact_store.table_writer(owner, header, name=name, mimetype="text/csv",
+                                     line_terminator=line_terminator) as writer:
+        for row in rows:
+            writer.append(row.fields() if hasattr(row, "fields") else row)
+        return writer.close()
 
-    if not rows:
-        return "<p>No data available</p>"
-
-    max_columns = max(len(row) for row in rows)
-    header_html = "".join(f"<th>{html.escape(col)}</th>" for col in rows[0])
-    header_html += "".join("<th></th>" for _ in range(max_columns - len(rows[0])))
-
-    html_table = f'''
-    <table class="table table-sm table-striped table-bordered align-middle shadow-sm rounded">
-        <thead class="table-light">
-            <tr>{header_html}</tr>
-        </thead>
-        <tbody>
-    '''
-
-    for row in rows[1:]:
-        padded_row = row + [""] * (max_columns - len(row))
-        row_html = "".join(
-            f"<td>{html.escape(cell) if cell.strip() else '<span class=\"text-muted\">—</span>'}</td>"
-            for cell in padded_row
-        )
-        html_table += f"<tr>{row_html}</tr>"
 
-    html_table += "</tbody></table>"
-    return html_table
+# Where the result pages fetch a stored table from, one page at a time
+def table_url(artifact_id):
+    return f"/api/table/{artifact_id}"
+
 
+# The picker's (name, id) pairs, pulled from the remaining catalog pages while the
+# template streams. A page that fails mid-way sets error, which the template shows
+# below the list instead of passing a truncated catalog off as the whole one.
+class ProcessCatalog:
+    def __init__(self, pages):
+        self.pages = pages
+        self.error = None
 
-def calculate_subprocess_summary(csv_text):
-    lines = csv_text.strip().split("\n")
-    component_ids = set()
-    subprocess_ids = set()
+    def __iter__(self):
+        try:
+            yield from iter_process_name_id(self.pages)
+        except QueryError as e:
+            print("Process catalog incomplete:", e)
+            self.error = "Only part of the process list could be retrieved. Please try again."
 
-    for line in lines:
-        columns = line.split(",")
-        if columns:
-            component_ids.add(columns[0].strip())
-        if "processcall" in line:
-            match = re.search(r"@processId:([^\s,]+)", line)
-            if match:
-                subprocess_ids.add(match.group(1).strip())
 
-    total = len(component_ids) - 1
-    sub = len(subprocess_ids)
-    main = total - sub
-    return f"Total Processes,Main Processes,Sub-Processes\n{total},{main},{sub}"
+# Fetches the first catalog page up front (so bad credentials still show an error)
+# and returns a lazy catalog that pulls the remaining pages while the template
+# streams, letting the picker render as soon as the first page lands
+def stream_process_catalog(username, password, acc_id):
+    pages = iter_process_pages(username, password, acc_id)
+    first_page = next(pages, None)
+    if first_page is None:
+        return None
+    return ProcessCatalog(itertools.chain([first_page], pages))
 
 
 # -------------------------------------
@@ -100,69 +97,110 @@ def extract_process_metadata():
     selected_processes = request.form.getlist("selected_processes")
 
     if not selected_processes:
-        raw_response = get_all_processes(username, password, id=acc_id)
-        if not raw_response:
+        processes = stream_process_catalog(username, password, acc_id)
+        if processes is None:
             return render_template("extract_form.html", message="Failed to retrieve processes.")
 
-        process_dict = extract_process_name_id(raw_response)
-        return render_template("extract_form.html", processes=process_dict)
+        return stream_template("extract_form.html", processes=processes)
+
+    include_subprocesses = request.form.get("include_subprocesses") == "on"
+    job = jobs.submit("extract", current_owner(), run_extract_job, username, password, acc_id, selected_processes, include_subprocesses)
+    return render_template("job_status.html", job=job.to_dict(), title="Extracting process metadata")
 
-    
-    csv_text = get_all_data(username, password, acc_id, selected_processes)
-    try:
-        if csv_text:
-            table_html = csv_to_html_table(csv_text)
-            return render_template("extract_result.html", table=table_html, csv_data=csv_text)
-        else:
-            return render_template("extract_form.html", message=csv_text.text)
 
-    except requests.RequestException as e:
-        return jsonify({'error': f'Connection failed: {str(e)}'}), 502
+def run_extract_job(job, username, password, acc_id, selected_processes, include_subprocesses):
+    with job.stage("export"):
+        rows = get_all_rows(username, password, acc_id, selected_processes, include_subprocesses, progress=job)
+    if not rows:
+        return {"template": "extract_form.html", "context": {"message": "No data returned for the selected processes."}}
+
+    with job.stage("render"):
+        csv_id = store_table(METADATA_HEADER, rows, "response_data.csv", job.owner)
+    return {"template": "extract_result.html", "context": {"table": table_url(csv_id), "csv_id": csv_id}}
 
 # Evaluate Function
 @app.route("/evaluate", methods=["GET", "POST"])
 def evaluate_process_metadata():
-    global _pdf_cache, _main_csv_cache, _full_csv_cache
-
     if request.method == "GET":
         return render_template("evaluate_form.html")
 
+    owner = current_owner()
     uploaded_file = request.files.get("csvfile")
-    csv_data = uploaded_file.read().decode("utf-8") if uploaded_file else request.form.get("csv_data")
-
-    if not csv_data:
+    if uploaded_file:
+        # Copied to the artifact store in chunks; the job reads it back line by line
+        upload_id = artifact_store.put_file(uploaded_file.stream, owner, name="upload.csv")
+        if artifact_store.meta(upload_id, owner)["size"] == 0:
+            artifact_store.delete(upload_id)
+            upload_id = None
+        source = ("upload", upload_id)
+    elif request.form.get("artifact_id"):
+        # A previous extract result, referenced by id instead of posted back
+        artifact_id = request.form["artifact_id"]
+        meta = artifact_store.meta(artifact_id, owner)
+        source = ("table", artifact_id if meta and meta["kind"] == "table" else None)
+    else:
+        source = ("text", request.form.get("csv_data"))
+
+    if not source[1]:
         return render_template("evaluate_form.html", message="Please upload or paste a CSV file.")
 
+    job = jobs.submit("evaluate", owner, run_evaluate_job, source)
+    return render_template("job_status.html", job=job.to_dict(), title="Evaluating process metadata")
+
+
+# What run_evaluation reads for a source: the path of an uploaded file, which a
+# large evaluation shards across workers by byte range, or the lines of pasted
+# text or a stored table, without loading the table whole
+def csv_source(source, owner):
+    kind, value = source
+    if kind == "text":
+        return value.split("\n")
+    if kind == "table":
+        table = artifact_store.table(value, owner)
+        if table is None:
+            raise ValueError("The extracted CSV has expired, please extract again.")
+        return itertools.chain([",".join(table.header)], (",".join(row) for row in table.iter_rows()))
+    path = artifact_store.path(value, owner)
+    if path is None:
+        raise ValueError("The uploaded CSV has expired, please upload it again.")
+    return pathlib.Path(path)
+
+
+def run_evaluate_job(job, source):
     try:
-        # Run full evaluation locally
-        full_eval_file, main_result_file, pdf_file = run_evaluation(csv_data)
-
-        # Read contents back for rendering and caching
-        with open(full_eval_file, 'r', encoding='utf-8') as f:
-            full_eval_csv = f.read()
-
-        with open(main_result_file, 'r', encoding='utf-8') as f:
-            main_result_csv = f.read()
-
-        with open(pdf_file, 'rb') as f:
-            _pdf_cache = f.read()
-
-        _main_csv_cache = main_result_csv
-        _full_csv_cache = full_eval_csv
-    
-        return render_template(
-            "evaluate_result.html",
-            main_result=csv_to_html_table(main_result_csv),
-            full_evaluation=csv_to_html_table(full_eval_csv),
-            main_result_csv=main_result_csv,
-            full_eval_csv=full_eval_csv,
-            pdf_url="/download/pdf",
-            main_csv_url="/download/main",
-            full_csv_url="/download/full"
-        )
+        # The full evaluation has a row per input line, so it is written to its
+        # table artifact as the lines are categorized rather than held in memory
+        # (by the workers, in parts, when a large upload is sharded)
+        with artifact_store.table_writer(job.owner, name="fullEvaluation.csv", mimetype="text/csv",
+                                         line_terminator="\n") as full_table:
+            result = run_evaluation(csv_source(source, job.owner), stage=job.stage, full_rows=full_table)
+            full_id = full_table.close(result["full_header"])
+
+        # Store the results for the table pages and downloads
+        with job.stage("render"):
+            main_id = store_table(result["main_header"], result["main_rows"], "mainResult.csv", job.owner, "\n")
+            # Only the report inputs are kept; the PDF is rendered on first download
+            pdf_id = artifact_store.put(result["report"], job.owner, kind="record", report=True,
+                                        name="Result.pdf", mimetype="application/pdf", inline=True)
+            bundle_id = artifact_store.put(
+                {"files": [["MainResult.csv", main_id], ["FullEvaluationResult.csv", full_id], ["Result.pdf", pdf_id]]},
+                job.owner, kind="record", name="evaluation_bundle.zip"
+            )
+
+            return {"template": "evaluate_result.html", "context": dict(
+                main_result=table_url(main_id),
+                full_evaluation=table_url(full_id),
+                pdf_url=f"/download/{pdf_id}",
+                main_csv_url=f"/download/{main_id}",
+                full_csv_url=f"/download/{full_id}",
+                zip_url=f"/download_zip/{bundle_id}"
+            )}
 
     except Exception as e:
-        return render_template("evaluate_form.html", message=f"Evaluation failed: {str(e)}")
+        return {"template": "evaluate_form.html", "context": {"message": f"Evaluation failed: {str(e)}"}}
+    finally:
+        if source[0] == "upload":
+            artifact_store.delete(source[1])
 
 
 # Migration Function
@@ -192,114 +230,193 @@ def migrate_processes():
 
     # Step 2: If processes are not selected, fetch process list
     if not selected_processes:
-        raw_response = get_all_processes(username, password, acc_id)
-        if not raw_response:
+        processes = stream_process_catalog(username, password, acc_id)
+        if processes is None:
             return render_template(
                 "migration.html",
                 message="Failed to retrieve processes. Check your credentials.",
                 **common_context
             )
 
-        process_dict = extract_process_name_id(raw_response)  # Should return List[Dict]
-        return render_template(
+        return stream_template(
             "migration.html",
-            processes=process_dict,
+            processes=processes,
             message="Processes fetched successfully.",
             **common_context
         )
 
-    # Step 3: If processes are selected, generate preview
-    try:
-        csv_text = migration.get_all_data(username, password, acc_id, selected_processes)
+    # Step 3: If processes are selected, generate preview in the background.
+    # The password is only passed to the job; it is kept neither in the job record
+    # nor in the session (an old copy there is dropped), so the preview asks for it
+    # again before another fetch.
+    session.pop("boomiPassword", None)
+    job_context = {key: value for key, value in common_context.items() if key != "boomiPassword"}
+    job = jobs.submit("migrate", current_owner(), run_migrate_job, username, password, acc_id, selected_processes, job_context)
+    return render_template("job_status.html", job=job.to_dict(), title="Building migration preview")
 
-        if not csv_text:
-            return render_template(
-                "migration.html",
-                message="No data returned for the selected processes.",
-                **common_context
-            )
 
-        table_html = csv_to_html_table(csv_text)
-        return render_template(
-            "migration.html",
-            table=table_html,
-            csv_data=csv_text,
-            selected_processes=selected_processes,
-            message="Migration Preview generated.",
-            **common_context
-        )
-
-    except requests.RequestException as e:
-        return jsonify({'error': f'Connection failed: {str(e)}'}), 502
+def run_migrate_job(job, username, password, acc_id, selected_processes, common_context):
+    with job.stage("export"):
+        components = migration.get_all_components(username, password, acc_id, selected_processes, progress=job)
+        rows = migration.migration_view(components)
 
+    if not rows:
+        return {"template": "migration.html", "context": dict(
+            message="No data returned for the selected processes.",
+            **common_context
+        )}
+
+    with job.stage("connectors"):
+        connectors = connector_details(username, password, acc_id, components)
+
+    with job.stage("render"):
+        csv_id = store_table(MIGRATION_HEADER, rows, "response_data.csv", job.owner)
+        connectors_id = store_table(CONNECTOR_HEADER, connectors, "connector_details.csv", job.owner)
+        # Only the plans are kept; the skeletons are built while they download
+        iflows_id = artifact_store.put({"iflows": migration.iflow_plans(components)}, job.owner, kind="record",
+                                       name="iflow_skeletons.zip")
+    return {"template": "migration.html", "context": dict(
+        table=table_url(csv_id),
+        csv_id=csv_id,
+        iflows_url=f"/download_iflows/{iflows_id}",
+        connectors_table=table_url(connectors_id) if connectors else None,
+        connectors_csv_url=f"/download/{connectors_id}",
+        selected_processes=selected_processes,
+        message="Migration Preview generated.",
+        **common_context
+    )}
 
 
-@app.route("/download/main")
-def download_main_csv():
-    if _main_csv_cache:
-        return send_file(
-            io.BytesIO(_main_csv_cache.encode('utf-8')),
-            mimetype="text/csv",
-            as_attachment=True,
-            download_name="mainResult.csv"
-        )
-    return "Main CSV not available", 404
+# -------------------------------------
+# Background jobs
+# -------------------------------------
 
-@app.route("/download/full")
-def download_full_csv():
-    if _full_csv_cache:
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    state = jobs.get_job_state(job_id, current_owner())
+    if state is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    state.pop("result", None)
+    return jsonify(state)
+
+
+@app.route("/jobs/<job_id>/result")
+def job_result(job_id):
+    state = jobs.get_job_state(job_id, current_owner())
+    if state is None:
+        return "Unknown or expired job", 404
+    if state["status"] == "failed":
+        return render_template("job_status.html", job=state, title="Job failed"), 500
+    if state["status"] != "done":
+        return render_template("job_status.html", job=state, title="Still working"), 202
+    return render_template(state["result"]["template"], **state["result"]["context"])
+
+
+# One page of a stored table as JSON: ?page=&per_page=&sort=<column>&dir=asc|desc&q=<filter>
+@app.route("/api/table/<artifact_id>")
+def table_page(artifact_id):
+    view = table_views.get(artifact_id, current_owner())
+    if view is None:
+        return jsonify({"error": "Unknown or expired table"}), 404
+    return jsonify(view.page(
+        page=request.args.get("page", 1, type=int),
+        per_page=request.args.get("per_page", 50, type=int),
+        sort=request.args.get("sort", type=int),
+        descending=request.args.get("dir") == "desc",
+        query=request.args.get("q", "")
+    ))
+
+
+# Serves a stored CSV table or file; only the session that created it can fetch it.
+# Tables are streamed as CSV chunk by chunk from disk, files straight from disk.
+@app.route("/download/<artifact_id>")
+def download_artifact(artifact_id):
+    owner = current_owner()
+    meta = artifact_store.meta(artifact_id, owner)
+    if meta is None or (meta["kind"] == "record" and not meta.get("report")):
+        return "Download not available or expired", 404
+
+    if meta.get("report"):
+        report = artifact_store.get(artifact_id, owner)
+        if report is None:
+            return "Download not available or expired", 404
         return send_file(
-            io.BytesIO(_full_csv_cache.encode('utf-8')),
-            mimetype="text/csv",
-            as_attachment=True,
-            download_name="fullEvaluation.csv"
+            io.BytesIO(report_pdf(report)),
+            mimetype=meta["mimetype"],
+            as_attachment=not meta.get("inline", False),
+            download_name=meta["name"]
         )
-    return "Full Evaluation CSV not available", 404
-
-@app.route("/download/pdf")
-def download_pdf():
-    return send_file(
-        io.BytesIO(_pdf_cache),
-        mimetype='application/pdf',
-        as_attachment=False,
-        download_name='Result.pdf'
-    )
-
 
-@app.route("/download_zip", methods=["POST"])
-def download_zip():
-    main_csv = request.form.get("main_csv")
-    full_csv = request.form.get("full_csv")
-    if not main_csv or not full_csv:
-        return "Missing CSV data", 400
+    if meta["kind"] == "table":
+        chunks = artifact_chunks(artifact_id, owner, meta)
+        if chunks is None:
+            return "Download not available or expired", 404
+        return Response(chunks(), mimetype=meta["mimetype"],
+                        headers={"Content-Disposition": f"attachment; filename={meta['name']}"})
 
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w") as zipf:
-        zipf.writestr("MainResult.csv", main_csv)
-        zipf.writestr("FullEvaluationResult.csv", full_csv)
-        zipf.writestr("Result.pdf", _pdf_cache)
-
-    zip_buffer.seek(0)
     return send_file(
-        zip_buffer,
-        mimetype="application/zip",
-        as_attachment=True,
-        download_name="evaluation_bundle.zip"
+        artifact_store.path(artifact_id, owner),
+        mimetype=meta.get("mimetype", "application/octet-stream"),
+        as_attachment=not meta.get("inline", False),
+        download_name=meta.get("name", artifact_id)
     )
 
 
-@app.route("/download_csv", methods=["POST"])
-def download_csv():
-    csv_data = request.form.get("csv_data")
-    if not csv_data:
-        return "No CSV data provided", 400
-
-    return send_file(
-        io.BytesIO(csv_data.encode("utf-8")),
-        mimetype="text/csv",
-        as_attachment=True,
-        download_name="response_data.csv"
-    )
+# A callable producing the download bytes of an artifact chunk by chunk, or None
+# when it is gone. Everything is resolved up front so a missing piece is a 404
+# rather than a broken stream.
+def artifact_chunks(artifact_id, owner, meta=None):
+    meta = meta or artifact_store.meta(artifact_id, owner)
+    if meta is None:
+        return None
+    if meta.get("report"):
+        report = artifact_store.get(artifact_id, owner)
+        return None if report is None else (lambda: [report_pdf(report)])
+    if meta["kind"] == "table":
+        table = artifact_store.table(artifact_id, owner)
+        if table is None:
+            return None
+        line_terminator = meta.get("line_terminator", "\r\n")
+        return lambda: iter_encoded(iter_csv_chunks(table.header, table.iter_rows(), line_terminator))
+    if meta["kind"] == "blob":
+        path = artifact_store.path(artifact_id, owner)
+        return None if path is None else (lambda: iter_file_chunks(path))
+    return None
+
+
+@app.route("/download_zip/<bundle_id>")
+def download_zip(bundle_id):
+    owner = current_owner()
+    bundle = artifact_store.get(bundle_id, owner)
+    if not isinstance(bundle, dict) or "files" not in bundle:
+        return "Download not available or expired", 404
+
+    members = []
+    for name, artifact_id in bundle["files"]:
+        chunks = artifact_chunks(artifact_id, owner)
+        if chunks is None:
+            return "Download not available or expired", 404
+        members.append((name, chunks))
+
+    return Response(iter_zip(members), mimetype="application/zip",
+                    headers={"Content-Disposition": "attachment; filename=evaluation_bundle.zip"})
+
+
+# One iFlow skeleton project per migrated process, built in worker processes
+# and streamed as each finishes
+@app.route("/download_iflows/<plans_id>")
+def download_iflows(plans_id):
+    plans = artifact_store.get(plans_id, current_owner())
+    if not isinstance(plans, dict) or "iflows" not in plans:
+        return "Download not available or expired", 404
+
+    return Response(iter_iflow_zip(plans["iflows"]), mimetype="application/zip",
+                    headers={"Content-Disposition": "attachment; filename=iflow_skeletons.zip"})
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return render_template("evaluate_form.html", message=f"The upload is larger than the {MAX_UPLOAD_MB} MB limit."), 413
 
 
 # -------------------------------------
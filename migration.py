@@ -18,13 +18,14 @@ Steps:
 
     Shape-Label     = userlabel ? userlabel : name
     Original-type   = shapetype
-    CPI-Alternative = shapes_mappings.get(shape_type, "NA")
-    Revised-seq     = index-no
-    Status          = Mapped 
+    CPI-Alternative = category_rules.alternative(connectorType or shape_type)
+    Revised-seq     = execution order from the dragpoints (flow_graph)
+    Status          = Mapped / Unmapped / Unreachable
 
 2 Connector Details
-    - get connector details button
-    - fetching [["Type", "Action", "Id"]] 
+    - shown with the preview (connector_details.py)
+    - fetching [["Type", "Action", "Id"]], connection and operation names
+      resolved once per unique id through Component/bulk
 
 3 Transfer Details
     - Sender and Receiver with dropdown
@@ -32,167 +33,43 @@ Steps:
 4 
 '''
 
-import io
-import csv
-import json
-import xmltodict
-import requests
-from requests.auth import HTTPBasicAuth
-
-# Define the shapes_mappings    
-shapes_mappings = {
-    "disk": "sftp",
-    "map": "messageMapping",
-    "message": "contentModifier",
-    "processcall": "processCall",
-    "processroute": "router",
-    "Base64 Decode": "base64Decoder",
-    "Base64 Encode": "base64Encoder",
-    "Character Decode": "groovyScript",
-    "Character Encode": "groovyScript",
-    "Combine Documents": "gather",
-    "Custom Scripting": "groovyScript",
-    "Search/Replace": "messageMapping",
-    "Split Documents": "generalSplitter",
-    "Mapjsontomultipartformdatamime": "groovyScript",
-    "Mapmultipartformdatamimetojson": "groovyScript",
-    "Pgp Encrypt": "pgpEncryptor",
-    "Pgp Decrypt": "pgpDecryptor",
-    "Xslt Ttransformation": "xsltMapping",
-    "Zip": "zipCompression",
-    "Unzip": "zipDecompression",
-    "branch": "sequentialMulticast",
-    "route": "router",
-    "decision": "router",
-    "start": "start",
-    "stop": "end",
-    "catcherrors": "exceptionSubprocess",
-    "exception": "exceptionSubprocess",
-    "setproperties": "contentModifier",
-    "cache": "data store",
-    "flowcontrol": "splitter/multicast/gather",
-    "businessrules": "routers/validators",
-    "diskconnector": "sftp",
-    "customscripting": "groovyScript",
-    "documentproperties": "contentModifier",
-    "dynamicdocumentproperties": "groovyScript",
-    "processproperties": "contentModifier",
-    "dynamicprocessproperties": "groovyScript",
-    "ftp": "ftp",
-    "sftp": "sftp",
-    "http": "http",
-    "mail": "mail",
-    "odata": "odata",
-    "rest": "http",
-    "salesforce": "salesforce",
-    "netsuite": "netsuite",
-    "successfactors": "successfactors",
-    "successfactorsmaster-Q2Q93V-SFSF-priv_prod": "successfactors",
-    "wssoapclientsdk": "soap",
-    "cleanse": "NA",
-    "programcommand": "groovyScript",
-    "aws": "openConnector",
-    "findchanges": "messageMapping",
-    "dataprocess": "Base64-Encode/Decode/Spiltter/zip-unzip/encrypt-decrypt/xslt",
-    "returndocuments": "end",
-    "notify": "groovy script with mpl logs"
-}
-
-
-def get_xml_from_boomi(process_id, username, password, accound_id):
-    url = f"https://api.boomi.com/api/rest/v1/{accound_id}/Component/{process_id}/export"
-    headers = {
-        "Accept": "application/xml"
-    }
-    try:
-        response = requests.get(url, auth=HTTPBasicAuth(username, password), headers=headers)
-        if response.status_code == 200:
-            # print(response.text) # for printing xml response
-            return response.text
-        print("Failed export:", response.status_code, response.text)
-    except requests.exceptions.RequestException as e:
-        print("Export error:", e)
-    return None
-
-
-def convert_xml_to_json(xml_data):
-    return json.loads(json.dumps(xmltodict.parse(xml_data)))
-
-
-def build_csv_from_json(json_data):
-    output = io.StringIO()
-    step_no = 0
-
-    fieldnames = ["StepNo", "ShapeLabel", "OriginalType", "CPIAlternative"]
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-
-    components = json_data.get("bns:Component", {})
-    if isinstance(components, dict):
-        components = [components]
-
-    for component in components:
-        name = component.get("@name", "")
-        shape_label = name
-
-        shapes = component.get("bns:object", {}).get("process", {}).get("shapes", {}).get("shape", [])
-        if isinstance(shapes, dict):
-            shapes = [shapes]
-
-        for shape in shapes:
-            shape_name = shape.get("@userlabel", "null")
-            step_no += 1
-            if shape_name != "":
-                shape_label = shape_name 
-            
-            original_type = shape.get("@shapetype", "")
-            cpi_alternative = shapes_mappings.get(original_type, "NA")
-
-            writer.writerow({
-                "StepNo"           : step_no,
-                "ShapeLabel"       : shape_label,
-                "OriginalType"     : original_type,
-                "CPIAlternative"   : cpi_alternative
-            })
-    return output.getvalue()
-
-
-# It removes single and double quotes from the strings
-def clean_configuration(csv_data):
-    csv_data = csv_data.replace("\"", "").replace("\'", "")
-    return csv_data
+from component_pipeline import get_components, migration_view, parse_component
+from models import MIGRATION_HEADER, rows_to_csv
 
 
 def parse_process_xml_to_metadata(xml_data):
-    json_data = convert_xml_to_json(xml_data)
+    rows = migration_view([parse_component(None, xml_data)])
+    return rows_to_csv(MIGRATION_HEADER, rows)
 
-    # Generate CSV
-    csv_data = build_csv_from_json(json_data)
 
-    cleaned_csv = clean_configuration(csv_data)
+# The selected processes fetched and parsed through component_pipeline.get_components
+# (progress, archive and replay as there). A process whose export fails is skipped.
+def get_all_components(username, password, account_id, selected_processes, progress=None, archive=None, replay=None):
+    return get_components(username, password, account_id, selected_processes, False, progress, archive, replay)
 
-    return cleaned_csv
+
+# Get the migration preview rows for the selected processes
+def get_all_rows(username, password, account_id, selected_processes, progress=None, archive=None, replay=None):
+    components = get_all_components(username, password, account_id, selected_processes, progress, archive, replay)
+    return migration_view(components)
+
+
+# The steps of every component in execution order, unreachable shapes left out,
+# as iflow_skeleton.build_iflow takes them
+def iflow_plans(components):
+    plans = []
+    for parsed in components:
+        rows = [row for row in migration_view([parsed]) if row.revised_sequence != ""]
+        rows.sort(key=lambda row: row.revised_sequence)
+        plans.append({
+            "component_id": parsed.component_id,
+            "name": parsed.rows[0].process_name if parsed.rows else parsed.component_id,
+            "steps": [[row.shape_label, row.original_type, row.cpi_alternative] for row in rows],
+        })
+    return plans
 
 
 # Get all data and convert it to csv file and return to main program
-def get_all_data(username, password, account_id, selected_processes):
-    all_csv_parts = []
-    for process_id in selected_processes:
-        xml_data = get_xml_from_boomi(process_id, username, password, account_id)
-        with open("xml_data.xml", "w") as text_file:
-            text_file.write(xml_data)
-        if xml_data:
-            csv_string = parse_process_xml_to_metadata(xml_data)
-            csv_lines = csv_string.splitlines()  # Safer than split('\n')
-            all_csv_parts.append(csv_lines[1:])  # Skip header
-
-    # Combine all rows under one header
-    final_csv = io.StringIO()
-    writer = csv.writer(final_csv)
-    writer.writerow(["StepNo", "ShapeLabel", "OriginalType", "CPIAlternative", "RevisedSequence", "Status"])
-    for part in all_csv_parts:
-        for line in part:
-            writer.writerow(line.split(','))
-
-    csv_text = final_csv.getvalue()
-    return csv_text
\ No newline at end of file
+def get_all_data(username, password, account_id, selected_processes, replay=None):
+    rows = get_all_rows(username, password, account_id, selected_processes, replay=replay)
+    return rows_to_csv(MIGRATION_HEADER, rows)
@@ -0,0 +1,121 @@
+# models.py
+# Row records shared by extract, evaluate and migration.
+#
+# Extraction builds these once and every later stage reads their fields
+# directly; CSV text is only produced when something is downloaded or
+# handed back to the browser.
+
+METADATA_HEADER = ["ComponentId", "ProcessName", "ShapeName", "ShapeType", "Configuration"]
+MIGRATION_HEADER = ["StepNo", "ShapeLabel", "OriginalType", "CPIAlternative", "RevisedSequence", "Status"]
+MAIN_RESULT_HEADER = ["ComponentId", "ProcessName", "Category"]
+CONNECTOR_HEADER = ["ProcessName", "StepNo", "ShapeLabel", "ConnectorType", "Action",
+                    "ConnectionId", "Connection", "OperationId", "Operation"]
+
+
+# Trailing fields left as None were absent from the source line and are not
+# written back, so a row always serializes to the line it was read from
+def _present(values):
+    fields = []
+    for value in values:
+        if value is None:
+            break
+        fields.append(str(value))
+    return fields
+
+
+class ShapeRow:
+    """One shape of one process: the ComponentId/ProcessName/ShapeName/ShapeType/Configuration line."""
+    __slots__ = ("component_id", "process_name", "shape_name", "shape_type", "configuration", "category")
+
+    def __init__(self, component_id, process_name=None, shape_name=None, shape_type=None, configuration=None):
+        self.component_id = component_id
+        self.process_name = process_name
+        self.shape_name = shape_name
+        self.shape_type = shape_type
+        self.configuration = configuration
+        self.category = None
+
+    # Everything after the fourth comma belongs to the configuration, matching
+    # how the evaluation has always re-joined row[4:]
+    @classmethod
+    def from_line(cls, line):
+        return cls(*line.split(",", 4))
+
+    def fields(self):
+        return _present((self.component_id, self.process_name, self.shape_name, self.shape_type, self.configuration))
+
+    def to_line(self):
+        return ",".join(self.fields())
+
+
+class ProcessSummary:
+    """Final category of one component, built from the categories of its shapes."""
+    __slots__ = ("component_id", "process_name", "category")
+
+    def __init__(self, component_id, process_name, category=None):
+        self.component_id = component_id
+        self.process_name = process_name
+        self.category = category
+
+    def fields(self):
+        return [self.component_id, self.process_name, self.category]
+
+
+class MigrationRow:
+    """One step of the migration preview."""
+    __slots__ = ("step_no", "shape_label", "original_type", "cpi_alternative", "revised_sequence", "status")
+
+    def __init__(self, step_no, shape_label, original_type, cpi_alternative, revised_sequence=None, status=None):
+        self.step_no = step_no
+        self.shape_label = shape_label
+        self.original_type = original_type
+        self.cpi_alternative = cpi_alternative
+        self.revised_sequence = revised_sequence
+        self.status = status
+
+    def fields(self):
+        return _present((self.step_no, self.shape_label, self.original_type, self.cpi_alternative,
+                         self.revised_sequence, self.status))
+
+
+def read_metadata_csv(lines):
+    """
+    Split metadata CSV lines into (header, rows). lines is CSV text or any
+    iterable of lines; blank lines are skipped and rows are produced lazily.
+    """
+    header, lines = read_metadata_lines(lines)
+    return header, (ShapeRow.from_line(line) for line in lines)
+
+
+def read_metadata_lines(lines):
+    """Like read_metadata_csv, but yields the data lines as text without line endings."""
+    if isinstance(lines, str):
+        lines = lines.split("\n")
+    lines = iter(lines)
+    header = next(lines, "").rstrip("\r\n")
+    return header.split(","), iter_data_lines(lines)
+
+
+def iter_data_lines(lines):
+    """Data lines without line endings, skipping blank ones."""
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            yield line
+
+
+def rows_to_csv(header, rows, line_terminator="\r\n"):
+    """Serialize a header and rows (records with fields() or plain lists) to CSV text."""
+    return "".join(iter_csv_chunks(header, rows, line_terminator))
+
+
+def iter_csv_chunks(header, rows, line_terminator="\r\n", chunk_rows=1000):
+    """The same text as rows_to_csv, produced chunk_rows lines at a time for streaming."""
+    lines = [",".join(header)]
+    for row in rows:
+        lines.append(",".join(str(value) for value in (row.fields() if hasattr(row, "fields") else row)))
+        if len(lines) >= chunk_rows:
+            yield line_terminator.join(lines) + line_terminator
+            lines = []
+    if lines:
+        yield line_terminator.join(lines) + line_terminator
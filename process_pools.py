@@ -0,0 +1,47 @@
+# process_pools.py
+# Long-lived pools of spawned worker processes, one per use (sharded
+# evaluation, iFlow skeleton builds).
+#
+# Pools use spawn: callers are job and request threads, and forking a threaded
+# process is unsafe. Starting workers is costly, so a pool is kept and reused
+# for as long as the same worker count is asked for. Callers lease it for the
+# duration of their work; when another count is asked for, a new pool replaces
+# it and the old one is shut down once its last lease is returned, never while
+# a caller may still submit to it.
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+
+class _Pool:
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.leases = 0
+        self.retired = False
+
+
+_pools = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def spawn_pool(name, workers):
+    """Lease the shared process pool called name, sized workers, for the with block."""
+    with _lock:
+        pool = _pools.get(name)
+        if pool is None or pool.workers != workers:
+            if pool is not None:
+                pool.retired = True
+                if not pool.leases:
+                    pool.executor.shutdown(wait=False)
+            pool = _pools[name] = _Pool(workers)
+        pool.leases += 1
+    try:
+        yield pool.executor
+    finally:
+        with _lock:
+            pool.leases -= 1
+            if pool.retired and not pool.leases:
+                pool.executor.shutdown(wait=False)
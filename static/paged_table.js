@@ -0,0 +1,105 @@
+// Renders <div class="paged-table" data-source="/api/table/<id>"> as a
+// searchable, sortable table that fetches one page at a time.
+(function () {
+    const PER_PAGE = 50;
+
+    function el(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    function initTable(container) {
+        const state = { page: 1, sort: null, desc: false, q: "" };
+
+        const search = el("input", "form-control form-control-sm mb-2");
+        search.type = "search";
+        search.placeholder = "Filter rows…";
+
+        const wrapper = el("div", "table-responsive");
+        const table = el("table", "table table-sm table-striped table-bordered align-middle shadow-sm rounded");
+        const thead = el("thead", "table-light");
+        const tbody = el("tbody");
+        table.append(thead, tbody);
+        wrapper.append(table);
+
+        const pager = el("div", "d-flex justify-content-between align-items-center");
+        const info = el("small", "text-muted");
+        const buttons = el("div", "btn-group btn-group-sm");
+        const prev = el("button", "btn btn-outline-secondary", "Previous");
+        const next = el("button", "btn btn-outline-secondary", "Next");
+        prev.type = next.type = "button";
+        buttons.append(prev, next);
+        pager.append(info, buttons);
+
+        container.append(search, wrapper, pager);
+
+        function render(data) {
+            thead.replaceChildren();
+            const headRow = el("tr");
+            data.header.forEach((name, index) => {
+                const arrow = state.sort === index ? (state.desc ? " ▼" : " ▲") : "";
+                const th = el("th", null, name + arrow);
+                th.style.cursor = "pointer";
+                th.addEventListener("click", () => {
+                    state.desc = state.sort === index ? !state.desc : false;
+                    state.sort = index;
+                    state.page = 1;
+                    load();
+                });
+                headRow.append(th);
+            });
+            thead.append(headRow);
+
+            tbody.replaceChildren();
+            data.rows.forEach(row => {
+                const tr = el("tr");
+                for (let i = 0; i < data.header.length; i++) {
+                    const value = row[i] || "";
+                    const td = el("td");
+                    if (value.trim()) {
+                        td.textContent = value;
+                    } else {
+                        td.append(el("span", "text-muted", "—"));
+                    }
+                    tr.append(td);
+                }
+                tbody.append(tr);
+            });
+
+            const first = data.matched ? (data.page - 1) * data.per_page + 1 : 0;
+            const last = Math.min(data.page * data.per_page, data.matched);
+            info.textContent = `Rows ${first}–${last} of ${data.matched}` +
+                (data.matched !== data.total ? ` (filtered from ${data.total})` : "");
+            prev.disabled = data.page <= 1;
+            next.disabled = data.page >= data.pages;
+            state.page = data.page;
+        }
+
+        function load() {
+            const params = new URLSearchParams({ page: state.page, per_page: PER_PAGE, q: state.q });
+            if (state.sort !== null) {
+                params.set("sort", state.sort);
+                params.set("dir", state.desc ? "desc" : "asc");
+            }
+            fetch(`${container.dataset.source}?${params}`)
+                .then(response => response.ok ? response.json() : Promise.reject(response.status))
+                .then(render)
+                .catch(() => { info.textContent = "The table is not available anymore."; });
+        }
+
+        let timer = null;
+        search.addEventListener("input", () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => { state.q = search.value; state.page = 1; load(); }, 250);
+        });
+        prev.addEventListener("click", () => { state.page -= 1; load(); });
+        next.addEventListener("click", () => { state.page += 1; load(); });
+        load();
+    }
+
+    document.addEventListener("DOMContentLoaded", () => {
+        document.querySelectorAll(".paged-table").forEach(initTable);
+    });
+})();
@@ -0,0 +1,66 @@
+# streaming.py
+# Chunked response bodies for downloads.
+#
+# ZIP archives are written straight into the response: zipfile writes each
+# member through a sink that the generator empties after every chunk, so only
+# one chunk of the archive is ever held in memory. Members are deflated.
+import io
+import zipfile
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target; zipfile falls back to data descriptors for it."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_file_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def iter_encoded(chunks, encoding="utf-8"):
+    for chunk in chunks:
+        yield chunk.encode(encoding)
+
+
+def iter_zip(members, compresslevel=6):
+    """
+    Yield a deflated ZIP archive chunk by chunk. members is a list of
+    (name, chunks) where chunks is a callable returning an iterable of bytes,
+    so a member's content is only produced while it is being written. A name
+    may be a ZipInfo to pick the member's date and compression.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+        for name, chunks in members:
+            with zipf.open(name, "w") as member:
+                for chunk in chunks():
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory, written when the archive closes
+    yield sink.drain()
@@ -0,0 +1,151 @@
+# table_pages.py
+# Server-side paging, sorting and filtering of stored result tables.
+#
+# Result pages no longer embed whole tables as HTML; the browser asks
+# /api/table/<artifact_id> for one page at a time. Tables stay on disk as row
+# chunks: an unsorted page reads only the chunk or two it covers. A sort or
+# filter scans the table once and keeps the resulting row order as a compact
+# index array; a page of it then reads each chunk holding one of its rows once,
+# which is still a chunk or two when the order follows the table but can be one
+# chunk per row when a sort scatters them.
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+from artifact_store import artifact_store
+
+# Table views (with their orders) kept per worker process
+TABLE_VIEW_CACHE = int(os.getenv("TABLE_VIEW_CACHE", "8"))
+# Sort/filter orders kept per table
+ORDERS_PER_TABLE = 8
+# Row chunks kept loaded per table
+CHUNKS_PER_TABLE = 4
+MAX_PER_PAGE = 500
+
+
+# Numbers sort numerically, everything else case-insensitively after them
+def _sort_key(value):
+    try:
+        return (0, float(value), "")
+    except ValueError:
+        return (1, 0.0, value.lower())
+
+
+class TableView:
+    def __init__(self, table):
+        self.table = table
+        self.header = table.header
+        self.total = table.row_count
+        self._chunks = OrderedDict()
+        self._orders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _chunk(self, index):
+        with self._lock:
+            if index in self._chunks:
+                self._chunks.move_to_end(index)
+                return self._chunks[index]
+        rows = self.table.chunk(index)
+        with self._lock:
+            self._chunks[index] = rows
+            while len(self._chunks) > CHUNKS_PER_TABLE:
+                self._chunks.popitem(last=False)
+        return rows
+
+    def _rows(self, indices):
+        chunks = {}
+        rows = []
+        for i in indices:
+            index, position = self.table.locate(i)
+            if index not in chunks:
+                chunks[index] = self._chunk(index)
+            rows.append(chunks[index][position])
+        return rows
+
+    def _order(self, sort, descending, query):
+        key = (sort, descending, query)
+        with self._lock:
+            if key in self._orders:
+                self._orders.move_to_end(key)
+                return self._orders[key]
+
+        indices = array("l")
+        sort_keys = []
+        index = 0
+        for rows in self.table.iter_chunks():
+            for row in rows:
+                if not query or query in "\x1f".join(row).lower():
+                    indices.append(index)
+                    if sort is not None:
+                        sort_keys.append(_sort_key(row[sort] if sort < len(row) else ""))
+                index += 1
+        if sort is not None:
+            positions = sorted(range(len(indices)), key=sort_keys.__getitem__, reverse=descending)
+            indices = array("l", (indices[position] for position in positions))
+
+        with self._lock:
+            self._orders[key] = indices
+            while len(self._orders) > ORDERS_PER_TABLE:
+                self._orders.popitem(last=False)
+        return indices
+
+    def page(self, page=1, per_page=50, sort=None, descending=False, query=""):
+        """One page of rows plus the counts the pager needs; sort is a column index."""
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+        if sort is not None and not 0 <= sort < len(self.header):
+            sort = None
+        query = (query or "").strip().lower()
+
+        if sort is None and not query:
+            matched = self.total
+            pages = max(1, -(-matched // per_page))
+            page = max(1, min(page, pages))
+            rows = self._rows(range((page - 1) * per_page, min(page * per_page, matched)))
+        else:
+            order = self._order(sort, descending, query)
+            matched = len(order)
+            pages = max(1, -(-matched // per_page))
+            page = max(1, min(page, pages))
+            rows = self._rows(order[(page - 1) * per_page:page * per_page])
+
+        return {
+            "header": self.header,
+            "rows": rows,
+            "page": page,
+            "per_page": per_page,
+            "pages": pages,
+            "total": self.total,
+            "matched": matched,
+        }
+
+
+class TableViews:
+    def __init__(self, max_tables=TABLE_VIEW_CACHE):
+        self.max_tables = max_tables
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, artifact_id, owner):
+        """The view of a table artifact visible to owner, or None."""
+        meta = artifact_store.meta(artifact_id, owner)
+        if meta is None or meta["kind"] != "table":
+            return None
+        with self._lock:
+            view = self._views.get(artifact_id)
+            if view is not None:
+                self._views.move_to_end(artifact_id)
+                return view
+
+        table = artifact_store.table(artifact_id, owner)
+        if table is None:
+            return None
+        view = TableView(table)
+        with self._lock:
+            self._views[artifact_id] = view
+            while len(self._views) > self.max_tables:
+                self._views.popitem(last=False)
+        return view
+
+
+table_views = TableViews()
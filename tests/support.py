@@ -0,0 +1,30 @@
+# tests/support.py
+# Shared setup for the unit tests: import paths, a private artifact store and
+# synthetic metadata CSVs.
+#
+#   python -m unittest discover -s tests
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# The module-level artifact store is created on import; keep it out of the shared /tmp one
+if "ARTIFACT_STORE_DIR" not in os.environ:
+    os.environ["ARTIFACT_STORE_DIR"] = tempfile.mkdtemp(prefix="boomi-test-artifacts-")
+    atexit.register(shutil.rmtree, os.environ["ARTIFACT_STORE_DIR"], True)
+os.environ.setdefault("BOOMI_EXPORT_CACHE_MAX_MB", "0")
+
+from synthetic import generate_exports
+from extract import parse_process_xml_to_metadata
+
+
+def synthetic_csv(processes, shapes_per_process, seed=0):
+    """Metadata CSV text of a batch of synthetic processes, as one extract would give it."""
+    texts = [parse_process_xml_to_metadata(xml_data)
+             for _, xml_data in generate_exports(processes, shapes_per_process, seed=seed)]
+    return texts[0] + "".join(text.split("\r\n", 1)[1] for text in texts[1:])
@@ -0,0 +1,156 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (import paths)
+
+from artifact_store import ArtifactStore, RowChunks, iter_part_rows, ensure_private_dir, shared_secret_key
+
+
+class ArtifactStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = ArtifactStore(os.path.join(self.directory, "store"))
+
+    def test_blob_and_record(self):
+        blob_id = self.store.put("text", "me", name="a.txt")
+        self.assertEqual(self.store.get(blob_id, "me"), b"text")
+        self.assertEqual(self.store.meta(blob_id, "me")["name"], "a.txt")
+        record_id = self.store.put({"a": [1, 2]}, "me", kind="record")
+        self.assertEqual(self.store.get(record_id, "me"), {"a": [1, 2]})
+
+    def test_other_owners_see_nothing(self):
+        blob_id = self.store.put(b"x", "me")
+        table_id = self.store.put({"header": ["a"], "rows": [["1"]]}, "me", kind="table")
+        for artifact_id in (blob_id, table_id):
+            self.assertIsNone(self.store.get(artifact_id, "you"))
+            self.assertIsNone(self.store.meta(artifact_id, "you"))
+        self.assertIsNone(self.store.table(table_id, "you"))
+        self.assertIsNone(self.store.path(blob_id, "you"))
+
+    def test_expired_artifacts_are_gone(self):
+        store = ArtifactStore(self.store.directory, ttl=0)
+        blob_id = store.put(b"x", "me")
+        time.sleep(0.01)
+        self.assertIsNone(store.get(blob_id, "me"))
+
+    def test_bad_ids_are_rejected(self):
+        with self.assertRaises(KeyError):
+            self.store.put(b"x", "me", artifact_id="../escape")
+
+
+class TableArtifactTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = ArtifactStore(os.path.join(self.directory, "store"))
+        self.rows = [[str(i), f"name {i}"] for i in range(2500)]
+
+    def test_written_in_chunks(self):
+        with self.store.table_writer("me", ["id", "name"], chunk_rows=1000) as writer:
+            writer.extend(self.rows)
+            table_id = writer.close()
+        table = self.store.table(table_id, "me")
+        self.assertEqual((table.header, table.row_count, table.chunk_rows), (["id", "name"], 2500, 1000))
+        self.assertEqual([len(chunk) for chunk in table.iter_chunks()], [1000, 1000, 500])
+        self.assertEqual(table.chunk(2), self.rows[2000:])
+        self.assertEqual(list(table.iter_rows()), self.rows)
+        self.assertEqual(self.store.get(table_id, "me"), {"header": ["id", "name"], "rows": self.rows})
+
+    def test_header_set_on_close(self):
+        with self.store.table_writer("me") as writer:
+            writer.append(["1"])
+            table_id = writer.close(["late"])
+        self.assertEqual(self.store.table(table_id, "me").header, ["late"])
+
+    def test_unclosed_table_is_discarded(self):
+        with self.assertRaises(RuntimeError):
+            with self.store.table_writer("me", ["id"], artifact_id="partial") as writer:
+                writer.extend(self.rows)
+                raise RuntimeError("job failed")
+        self.assertIsNone(self.store.table("partial", "me"))
+        self.assertEqual(os.listdir(self.store.directory), [])
+
+    def test_appended_parts(self):
+        part_path = os.path.join(self.directory, "part")
+        with open(part_path, "wb") as f:
+            part = RowChunks(f, chunk_rows=1000)
+            for row in self.rows[:1500]:
+                part.append(row)
+            layout = part.layout()
+        self.assertEqual(list(iter_part_rows(part_path, layout)), self.rows[:1500])
+
+        with self.store.table_writer("me", ["id", "name"], chunk_rows=1000) as writer:
+            writer.extend(self.rows[:10])
+            writer.append_part(part_path, layout)
+            writer.extend(self.rows[1510:])
+            table_id = writer.close()
+        table = self.store.table(table_id, "me")
+        expected = self.rows[:10] + self.rows[:1500] + self.rows[1510:]
+        self.assertEqual(list(table.iter_rows()), expected)
+        self.assertEqual([len(chunk) for chunk in table.iter_chunks()], [10, 1000, 500, 990])
+        for row in (0, 9, 10, 1009, 1010, 1509, 1510, 2499):
+            index, position = table.locate(row)
+            self.assertEqual(table.chunk(index)[position], expected[row])
+
+    def test_put_table(self):
+        table_id = self.store.put({"header": ["id", "name"], "rows": self.rows}, "me", kind="table", name="t.csv")
+        self.assertEqual(self.store.meta(table_id, "me")["name"], "t.csv")
+        self.assertEqual(list(self.store.table(table_id, "me").iter_rows()), self.rows)
+
+    def test_empty_table(self):
+        table_id = self.store.put({"header": ["id"], "rows": []}, "me", kind="table")
+        table = self.store.table(table_id, "me")
+        self.assertEqual((table.row_count, list(table.iter_rows())), (0, []))
+
+
+class PrivateDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.dict(os.environ)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop("FLASK_SECRET_KEY", None)
+
+    def test_created_private(self):
+        path = os.path.join(self.directory, "new")
+        ensure_private_dir(path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+
+    def test_open_directory_is_refused(self):
+        path = os.path.join(self.directory, "planted")
+        os.mkdir(path)
+        os.chmod(path, 0o777)
+        with self.assertRaises(RuntimeError):
+            ArtifactStore(path)
+        with self.assertRaises(RuntimeError):
+            shared_secret_key(path)
+
+    def test_file_is_refused(self):
+        path = os.path.join(self.directory, "file")
+        open(path, "w").close()
+        with self.assertRaises((RuntimeError, OSError)):
+            ensure_private_dir(path)
+
+    def test_symlink_is_refused(self):
+        target = os.path.join(self.directory, "target")
+        os.mkdir(target, 0o700)
+        link = os.path.join(self.directory, "link")
+        os.symlink(target, link)
+        with self.assertRaises(RuntimeError):
+            ensure_private_dir(link)
+
+    def test_secret_key_is_shared(self):
+        path = os.path.join(self.directory, "store")
+        key = shared_secret_key(path)
+        self.assertEqual(shared_secret_key(path), key)
+        self.assertEqual(os.stat(os.path.join(path, "secret_key")).st_mode & 0o777, 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
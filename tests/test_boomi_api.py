@@ -0,0 +1,208 @@
+import json
+import time
+import unittest
+import itertools
+from unittest import mock
+from email.utils import formatdate
+
+import support  # noqa: F401  (import paths)
+
+import boomi_api
+from boomi_api import QueryError, TokenBucket, _retry_after_seconds
+
+_accounts = itertools.count()
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None, content=b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+        self.text = content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeSession:
+    """Answers session.request with the given responses in turn."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.responses.pop(0)
+
+
+def query_page(names, token=None):
+    page = {"result": [{"name": name, "id": name.lower()} for name in names]}
+    if token:
+        page["queryToken"] = token
+    return FakeResponse(200, content=json.dumps(page).encode("utf-8"))
+
+
+class TokenBucketTest(unittest.TestCase):
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=50, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - started, 0.02)
+        for _ in range(5):
+            bucket.acquire()
+        # Five more tokens at 50/s take at least 0.1s
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_pause_blocks_every_caller(self):
+        bucket = TokenBucket(rate=1000, capacity=10)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_pause_never_shortens(self):
+        bucket = TokenBucket(rate=1000, capacity=10)
+        bucket.pause(0.2)
+        bucket.pause(0.01)
+        self.assertGreater(bucket.paused_until - time.monotonic(), 0.1)
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(_retry_after_seconds(FakeResponse(429, {"Retry-After": "3"})), 3.0)
+        self.assertEqual(_retry_after_seconds(FakeResponse(429, {"Retry-After": "-4"})), 0.0)
+
+    def test_http_date(self):
+        delay = _retry_after_seconds(FakeResponse(503, {"Retry-After": formatdate(time.time() + 30, usegmt=True)}))
+        self.assertTrue(25 <= delay <= 31, delay)
+        past = _retry_after_seconds(FakeResponse(503, {"Retry-After": formatdate(time.time() - 30, usegmt=True)}))
+        self.assertEqual(past, 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(_retry_after_seconds(FakeResponse(429)))
+        self.assertIsNone(_retry_after_seconds(FakeResponse(429, {"Retry-After": "soon"})))
+
+
+class SendTest(unittest.TestCase):
+    def send(self, responses):
+        session = FakeSession(responses)
+        account_id = f"acc-{next(_accounts)}"
+        with mock.patch.object(boomi_api, "get_session", return_value=session), \
+                mock.patch.object(boomi_api, "BACKOFF_BASE", 0.001), \
+                mock.patch.object(boomi_api.time, "sleep", wraps=time.sleep) as sleep:
+            response = boomi_api.send("user", "secret", account_id, "GET", "https://example.invalid/x")
+        return response, session, boomi_api._get_limiter(account_id)[0], sleep
+
+    def test_retry_after_pauses_the_account(self):
+        started = time.monotonic()
+        response, session, bucket, _ = self.send([FakeResponse(429, {"Retry-After": "0.2"}), FakeResponse(200)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(session.calls), 2)
+        self.assertGreater(bucket.paused_until, 0)
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    def test_backoff_without_retry_after(self):
+        response, session, bucket, sleep = self.send([FakeResponse(503), FakeResponse(502), FakeResponse(200)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(bucket.paused_until, 0.0)
+
+    def test_gives_up_after_max_retries(self):
+        responses = [FakeResponse(429) for _ in range(boomi_api.MAX_RETRIES + 1)]
+        response, session, _, _ = self.send(responses)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(session.calls), boomi_api.MAX_RETRIES + 1)
+
+    def test_other_errors_are_not_retried(self):
+        response, session, _, _ = self.send([FakeResponse(404)])
+        self.assertEqual((response.status_code, len(session.calls)), (404, 1))
+
+
+class SessionCacheTest(unittest.TestCase):
+    def setUp(self):
+        boomi_api._sessions.clear()
+
+    def test_keyed_by_account_and_user(self):
+        first = boomi_api.get_session("user", "secret", "acc")
+        self.assertIs(boomi_api.get_session("user", "secret", "acc"), first)
+        self.assertEqual(list(boomi_api._sessions), [("acc", "user")])
+
+    def test_new_password_replaces_session(self):
+        first = boomi_api.get_session("user", "old", "acc")
+        second = boomi_api.get_session("user", "new", "acc")
+        self.assertIsNot(first, second)
+        self.assertEqual(second.auth.password, "new")
+        self.assertEqual(len(boomi_api._sessions), 1)
+
+    def test_bounded(self):
+        with mock.patch.object(boomi_api, "MAX_SESSIONS", 2):
+            for user in ("a", "b", "c"):
+                boomi_api.get_session(user, "secret", "acc")
+        self.assertEqual(list(boomi_api._sessions), [("acc", "b"), ("acc", "c")])
+
+
+class QueryPagesTest(unittest.TestCase):
+    def pages(self, responses):
+        with mock.patch.object(boomi_api, "send", side_effect=responses):
+            return [page["result"] for page in boomi_api.iter_query_pages("u", "p", "acc", "Process")]
+
+    def test_follows_query_more(self):
+        pages = self.pages([query_page(["A"], "t1"), query_page(["B"], "t2"), query_page(["C"])])
+        self.assertEqual([[item["name"] for item in page] for page in pages], [["A"], ["B"], ["C"]])
+
+    def test_failed_first_page_yields_nothing(self):
+        self.assertEqual(self.pages([FakeResponse(401, content=b"denied")]), [])
+
+    def test_failed_later_page_raises(self):
+        with self.assertRaises(QueryError):
+            self.pages([query_page(["A"], "t1"), FakeResponse(500, content=b"down")])
+
+
+class BulkComponentTest(unittest.TestCase):
+    @staticmethod
+    def bulk_response(component_ids):
+        results = "".join(
+            f'<bns:response index="{i}" id="{cid}" statusCode="200">'
+            f'<bns:Result componentId="{cid}" name="Name {cid}" type="connector-settings" version="2"/>'
+            f'</bns:response>'
+            for i, cid in enumerate(component_ids)
+        )
+        return FakeResponse(200, content=(
+            '<bns:BulkResult xmlns:bns="http://api.platform.boomi.com/">' + results + "</bns:BulkResult>"
+        ).encode("utf-8"))
+
+    def test_batches_and_deduplicates(self):
+        requested = []
+
+        def send(username, password, account_id, method, url, json=None, **kwargs):
+            ids = [item["id"] for item in json["request"]]
+            requested.append(ids)
+            return self.bulk_response(ids)
+
+        ids = [f"c{i}" for i in range(boomi_api.BULK_BATCH_SIZE + 20)]
+        with mock.patch.object(boomi_api, "send", side_effect=send):
+            components = boomi_api.get_components_bulk("u", "p", "acc", ids + ids[:10])
+        self.assertEqual(sorted(len(batch) for batch in requested), [20, boomi_api.BULK_BATCH_SIZE])
+        self.assertEqual(sorted(sum(requested, [])), sorted(ids))
+        self.assertEqual(components["c7"]["name"], "Name c7")
+        self.assertEqual(len(components), len(ids))
+
+    def test_failed_batch_falls_back_to_single_gets(self):
+        def send(username, password, account_id, method, url, **kwargs):
+            if url.endswith("/bulk"):
+                return FakeResponse(500, content=b"down")
+            component_id = url.rsplit("/", 1)[1]
+            return FakeResponse(200, content=(
+                f'<bns:Component xmlns:bns="http://api.platform.boomi.com/" componentId="{component_id}" '
+                f'name="Single {component_id}" type="connector-action"/>').encode("utf-8"))
+
+        with mock.patch.object(boomi_api, "send", side_effect=send):
+            components = boomi_api.get_components_bulk("u", "p", "acc", ["a", "b"])
+        self.assertEqual({cid: c["name"] for cid, c in components.items()}, {"a": "Single a", "b": "Single b"})
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import os
+import shutil
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from support import synthetic_csv
+
+from models import read_metadata_csv, read_metadata_lines
+from category_rules import category_rules
+from evaluation_memo import ComponentMemo
+from artifact_store import ArtifactStore
+import evaluate
+from evaluate import (categorizeProcesses, evaluateProcesses, count_shape_type, calculate_subprocess_summary,
+                      evaluate_lines, evaluate_file_sharded, iter_shard_ranges, line_component_id, run_evaluation)
+
+
+def evaluated_lines(csv_text, evaluate, **kwargs):
+    """(summary fields, shape data, subprocess table, full rows)"""
+    full_rows = []
+    summaries, shape_data, sub_process = evaluate(read_metadata_lines(csv_text)[1], full_rows, **kwargs)
+    return [summary.fields() for summary in summaries], shape_data, sub_process, full_rows
+
+
+class SinglePassTest(unittest.TestCase):
+    def test_matches_the_separate_passes(self):
+        csv_text = synthetic_csv(30, 20, seed=1)
+        rows = categorizeProcesses(list(read_metadata_csv(csv_text)[1]))
+        expected = ([summary.fields() for summary in evaluateProcesses(rows)], count_shape_type(rows),
+                    calculate_subprocess_summary(rows))
+        summaries, shape_data, sub_process, emitted = evaluated_lines(csv_text, evaluate_lines, workers=1)
+        self.assertEqual((summaries, shape_data, sub_process), expected)
+        self.assertEqual([row[0] for row in emitted], [row.category for row in rows])
+
+
+class ShardedEvaluationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.csv_text = synthetic_csv(60, 25, seed=3)
+        cls.serial = evaluated_lines(cls.csv_text, evaluate_lines, workers=1)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "metadata.csv")
+        with open(self.path, "w", encoding="utf-8", newline="") as f:
+            f.write(self.csv_text)
+        self.start = self.csv_text.index("\n") + 1
+
+    def sharded(self, full_rows, **kwargs):
+        # Small shards so every worker gets several, and they finish out of order
+        summaries, shape_data, sub_process = evaluate_file_sharded(self.path, self.start, full_rows, workers=2,
+                                                                   shard_rows=50, **kwargs)
+        return [summary.fields() for summary in summaries], shape_data, sub_process, full_rows
+
+    def test_shard_ranges_keep_components_whole(self):
+        ranges = list(iter_shard_ranges(self.path, self.start, 2000))
+        self.assertGreater(len(ranges), 5)
+        self.assertEqual((ranges[0][0], ranges[-1][1]), (self.start, os.path.getsize(self.path)))
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, next_start)
+            before = data[:end].decode("utf-8").rstrip("\r\n").rsplit("\n", 1)[1]
+            after = data[end:].decode("utf-8").split("\n", 1)[0]
+            self.assertNotEqual(line_component_id(before), line_component_id(after))
+
+    def test_sharded_matches_serial(self):
+        self.assertEqual(self.sharded([]), self.serial)
+
+    def test_workers_write_table_parts(self):
+        store = ArtifactStore(os.path.join(self.directory, "store"))
+        with store.table_writer("me") as writer:
+            result = self.sharded(writer)
+            table_id = writer.close(["Category"])
+        table = store.table(table_id, "me")
+        self.assertEqual(result[:3], self.serial[:3])
+        self.assertEqual(list(table.iter_rows()), self.serial[3])
+        # Parts end where their ranges do, so chunks are not all chunk_rows long
+        last = table.row_count - 1
+        index, position = table.locate(last)
+        self.assertEqual(table.chunk(index)[position], self.serial[3][last])
+
+    def test_sharded_with_memo(self):
+        first = self.sharded([], memo=ComponentMemo())
+        second = self.sharded([], memo=ComponentMemo())
+        self.assertEqual(first, self.serial)
+        self.assertEqual(second, self.serial)
+
+    def test_run_evaluation_shards_a_file(self):
+        expected = run_evaluation(self.csv_text, memo=None)
+        for workers in (1, 2):
+            with mock.patch.object(evaluate, "EVALUATION_WORKERS", workers), \
+                    mock.patch.object(evaluate, "EVALUATION_PARALLEL_MIN_ROWS", 100):
+                result = run_evaluation(pathlib.Path(self.path), memo=None)
+            self.assertEqual(result["full_header"], expected["full_header"])
+            self.assertEqual(result["full_rows"], expected["full_rows"])
+            self.assertEqual(result["main_rows"], expected["main_rows"])
+            self.assertEqual(result["report"], expected["report"])
+
+    def test_overlong_line_is_rejected(self):
+        with mock.patch.object(evaluate, "MAX_CSV_LINE_BYTES", 200), \
+                mock.patch.object(evaluate, "EVALUATION_PARALLEL_MIN_ROWS", 100):
+            for workers in (1, 2):
+                with mock.patch.object(evaluate, "EVALUATION_WORKERS", workers), \
+                        self.assertRaisesRegex(ValueError, "longer than"):
+                    run_evaluation(pathlib.Path(self.path), memo=None)
+
+    def test_large_line_input_is_spooled_and_sharded(self):
+        with mock.patch.object(evaluate, "EVALUATION_PARALLEL_MIN_ROWS", 100), \
+                mock.patch.object(evaluate, "EVALUATION_SHARD_ROWS", 100), \
+                mock.patch.object(evaluate, "evaluate_file_sharded", wraps=evaluate_file_sharded) as sharded:
+            result = evaluated_lines(self.csv_text, evaluate_lines, workers=2)
+        sharded.assert_called_once()
+        self.assertEqual(result, self.serial)
+
+
+class MemoTest(unittest.TestCase):
+    def setUp(self):
+        self.csv_text = synthetic_csv(20, 10, seed=5)
+        self.components = len({line.split(",", 1)[0] for line in read_metadata_lines(self.csv_text)[1]})
+
+    def test_resubmission_hits_every_component(self):
+        memo = ComponentMemo()
+        first = evaluated_lines(self.csv_text, evaluate_lines, memo=memo, workers=1)
+        self.assertEqual((memo.hits, memo.misses), (0, self.components))
+        second = evaluated_lines(self.csv_text, evaluate_lines, memo=memo, workers=1)
+        self.assertEqual(memo.hits, self.components)
+        self.assertEqual(first, second)
+
+    def test_run_evaluation_uses_the_memo(self):
+        memo = ComponentMemo()
+        first = run_evaluation(self.csv_text, memo=memo)
+        second = run_evaluation(self.csv_text, memo=memo)
+        self.assertEqual(memo.hits, self.components)
+        self.assertEqual((first["full_rows"], first["main_rows"]), (second["full_rows"], second["main_rows"]))
+
+    def test_changed_component_is_reevaluated(self):
+        memo = ComponentMemo()
+        evaluated_lines(self.csv_text, evaluate_lines, memo=memo, workers=1)
+        header, rest = self.csv_text.split("\r\n", 1)
+        changed = header + "\r\n" + rest.replace("Synthetic Process 0,", "Renamed Process,", 1)
+        result = evaluated_lines(changed, evaluate_lines, memo=memo, workers=1)
+        self.assertEqual(memo.misses, self.components + 1)
+        self.assertEqual(result, evaluated_lines(changed, evaluate_lines, workers=1))
+
+    def test_rule_change_invalidates(self):
+        memo = ComponentMemo()
+        evaluated_lines(self.csv_text, evaluate_lines, memo=memo, workers=1)
+        version = category_rules.version
+        category_rules.version += 1
+        try:
+            evaluated_lines(self.csv_text, evaluate_lines, memo=memo, workers=1)
+        finally:
+            category_rules.version = version
+        self.assertEqual(memo.hits, 0)
+
+    def test_eviction_is_least_recently_used(self):
+        memo = ComponentMemo(max_entries=2)
+        memo.put("a", 1)
+        memo.put("b", 2)
+        memo.get("a")
+        memo.put("c", 3)
+        self.assertEqual((memo.get("a"), memo.get("b"), memo.get("c")), (1, None, 3))
+
+
+class RunEvaluationTest(unittest.TestCase):
+    def test_full_rows_sink(self):
+        csv_text = synthetic_csv(10, 12, seed=7)
+        expected = run_evaluation(csv_text)
+
+        class Sink:
+            def __init__(self):
+                self.rows = []
+
+            def append(self, row):
+                self.rows.append(row)
+
+        sink = Sink()
+        result = run_evaluation(csv_text, full_rows=sink)
+        self.assertIs(result["full_rows"], sink)
+        self.assertEqual(sink.rows, expected["full_rows"])
+        self.assertEqual(len(sink.rows), len(list(read_metadata_lines(csv_text)[1])))
+        self.assertEqual(result["main_rows"], expected["main_rows"])
+
+    def test_output_dir(self):
+        csv_text = synthetic_csv(5, 8, seed=8)
+        with tempfile.TemporaryDirectory() as output_dir:
+            result = run_evaluation(csv_text, output_dir=output_dir)
+            self.assertEqual(sorted(os.listdir(output_dir)),
+                             ["Migration_Assessment_Report.pdf", "fullEvaluation.csv", "mainResult.csv"])
+            with open(os.path.join(output_dir, "mainResult.csv"), encoding="utf-8") as f:
+                self.assertEqual(f.read().split("\n")[1], ",".join(result["main_rows"][0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import support  # noqa: F401  (import paths)
+
+from export_archive import ExportArchive, ExportArchiveReader
+
+
+class ExportArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "run.zip")
+
+    def test_round_trip(self):
+        archive = ExportArchive(self.path, "acc", ["p1"], max_pending=2)
+        for i in range(10):
+            archive.add(f"c{i}", i, f"<component id='{i}'/>")
+        archive.add("c1", 1, "<duplicate/>")
+        archive.add("empty", 1, "")
+        archive.close()
+
+        reader = ExportArchiveReader(self.path)
+        self.addCleanup(reader.close)
+        self.assertEqual((reader.account_id, reader.roots), ("acc", ["p1"]))
+        self.assertEqual(sorted(reader.component_ids()), sorted(f"c{i}" for i in range(10)))
+        self.assertEqual(reader.get("c1"), "<component id='1'/>")
+        self.assertEqual(reader.versions(["c3", "missing"]), {"c3": 3})
+        self.assertIsNone(reader.get("missing"))
+
+    def failing_archive(self, failing_member, max_pending):
+        archive = ExportArchive(self.path, "acc", max_pending=max_pending)
+        writestr = archive._zip.writestr
+
+        def failing_writestr(name, data):
+            if name == failing_member:
+                raise OSError("disk full")
+            return writestr(name, data)
+
+        archive._zip.writestr = failing_writestr
+        return archive
+
+    def test_failed_write_raises_on_close(self):
+        archive = self.failing_archive("components/c0.xml", max_pending=100)
+        archive.add("c0", 1, "<x/>")
+        with self.assertRaises(OSError):
+            archive.close()
+        # The ZIP is closed all the same
+        self.assertIsNone(archive._zip.fp)
+
+    def test_failed_write_raises_once_queue_is_full(self):
+        archive = self.failing_archive("components/c0.xml", max_pending=2)
+        with self.assertRaises(OSError):
+            for i in range(10):
+                archive.add(f"c{i}", 1, "<x/>")
+        archive._pending.clear()
+        archive.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
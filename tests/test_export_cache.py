@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+import itertools
+from unittest import mock
+
+import support  # noqa: F401  (import paths)
+
+import export_cache
+from export_cache import ExportCache
+
+
+class ExportCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        # A strictly increasing clock, so last-used order never ties
+        clock = itertools.count(1000)
+        patcher = mock.patch.object(export_cache, "time", mock.Mock(time=lambda: next(clock)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def blobs(self, cache):
+        return sorted(name for _, _, names in os.walk(os.path.join(cache.directory, "objects")) for name in names)
+
+    def test_round_trip_by_version(self):
+        cache = ExportCache(self.directory, max_bytes=1024)
+        cache.put("acc", "c1", 1, "<one/>")
+        cache.put("acc", "c1", 2, "<two/>")
+        self.assertEqual(cache.get("acc", "c1", 1), "<one/>")
+        self.assertEqual(cache.get("acc", "c1", "2"), "<two/>")
+        self.assertIsNone(cache.get("acc", "c1", 3))
+        self.assertIsNone(cache.get("other", "c1", 1))
+
+    def test_unversioned_and_disabled(self):
+        cache = ExportCache(self.directory, max_bytes=1024)
+        cache.put("acc", "c1", None, "<x/>")
+        self.assertIsNone(cache.get("acc", "c1", None))
+        disabled = ExportCache(os.path.join(self.directory, "off"), max_bytes=0)
+        disabled.put("acc", "c1", 1, "<x/>")
+        self.assertIsNone(disabled.get("acc", "c1", 1))
+        self.assertFalse(os.path.exists(disabled.directory))
+
+    def test_identical_exports_share_a_blob(self):
+        cache = ExportCache(self.directory, max_bytes=1024)
+        cache.put("acc", "c1", 1, "<same/>")
+        cache.put("acc", "c2", 5, "<same/>")
+        self.assertEqual(len(self.blobs(cache)), 1)
+        self.assertEqual(cache.get("acc", "c2", 5), "<same/>")
+
+    def test_evicts_least_recently_used(self):
+        cache = ExportCache(self.directory, max_bytes=250)
+        for component_id in ("a", "b", "c"):
+            cache.put("acc", component_id, 1, component_id * 100)
+        # Over budget after the third put: "a" was the oldest and is gone
+        self.assertIsNone(cache.get("acc", "a", 1))
+        self.assertIsNotNone(cache.get("acc", "b", 1))
+        # "b" was just read, so "c" is now the least recently used
+        cache.put("acc", "d", 1, "d" * 100)
+        self.assertIsNone(cache.get("acc", "c", 1))
+        self.assertEqual(cache.get("acc", "b", 1), "b" * 100)
+        self.assertEqual(cache.get("acc", "d", 1), "d" * 100)
+        self.assertEqual(len(self.blobs(cache)), 2)
+
+    def test_oversized_export_is_not_cached(self):
+        cache = ExportCache(self.directory, max_bytes=10)
+        cache.put("acc", "big", 1, "x" * 11)
+        self.assertIsNone(cache.get("acc", "big", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
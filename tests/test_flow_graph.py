@@ -0,0 +1,97 @@
+import unittest
+
+import support  # noqa: F401  (import paths)
+
+from flow_graph import shape_targets, build_adjacency, find_roots, revised_sequence
+
+
+def sequence(shapes):
+    """revised_sequence over (name, shape type, [target names]) in document order, by name."""
+    names = [name for name, _, _ in shapes]
+    result = revised_sequence(names, [targets for _, _, targets in shapes], [shape_type for _, shape_type, _ in shapes])
+    return dict(zip(names, result))
+
+
+class ShapeTargetsTest(unittest.TestCase):
+    def test_single_and_many_dragpoints(self):
+        self.assertEqual(shape_targets({"dragpoints": {"dragpoint": {"@toShape": "shape2"}}}), ["shape2"])
+        many = {"dragpoints": {"dragpoint": [{"@toShape": "a"}, {"@name": "unlinked"}, {"@toShape": "b"}]}}
+        self.assertEqual(shape_targets(many), ["a", "b"])
+
+    def test_no_dragpoints(self):
+        self.assertEqual(shape_targets({}), [])
+        self.assertEqual(shape_targets({"dragpoints": None}), [])
+        self.assertEqual(shape_targets({"dragpoints": {"dragpoint": None}}), [])
+
+    def test_links_outside_the_process_are_dropped(self):
+        self.assertEqual(build_adjacency(["a", "b"], [["b", "missing"], []]), [[1], []])
+
+
+class RevisedSequenceTest(unittest.TestCase):
+    def test_follows_links_not_document_order(self):
+        shapes = [
+            ("stop", "stop", []),
+            ("map", "map", ["stop"]),
+            ("start", "start", ["map"]),
+        ]
+        self.assertEqual(sequence(shapes), {"start": 1, "map": 2, "stop": 3})
+
+    def test_branch_paths_in_order_and_join_after_both(self):
+        shapes = [
+            ("start", "start", ["branch"]),
+            ("branch", "branch", ["p1a", "p2a"]),
+            ("p2a", "map", ["join"]),
+            ("p1a", "map", ["p1b"]),
+            ("p1b", "notify", ["join"]),
+            ("join", "message", ["stop"]),
+            ("stop", "stop", []),
+        ]
+        order = sorted(sequence(shapes).items(), key=lambda item: item[1])
+        self.assertEqual([name for name, _ in order], ["start", "branch", "p1a", "p1b", "p2a", "join", "stop"])
+
+    def test_try_catch_default_before_error_path(self):
+        shapes = [
+            ("start", "start", ["try"]),
+            ("try", "trycatch", ["ok", "error"]),
+            ("error", "notify", ["fail"]),
+            ("fail", "exception", []),
+            ("ok", "connectoraction", ["done"]),
+            ("done", "stop", []),
+        ]
+        result = sequence(shapes)
+        self.assertLess(result["done"], result["error"])
+        self.assertEqual(sorted(result.values()), list(range(1, 7)))
+
+    def test_unreachable_shapes_get_no_sequence(self):
+        shapes = [
+            ("start", "start", ["stop"]),
+            ("orphan", "map", ["stop"]),
+            ("stop", "stop", []),
+        ]
+        self.assertEqual(sequence(shapes), {"start": 1, "orphan": None, "stop": 2})
+
+    def test_cycle_terminates(self):
+        shapes = [
+            ("start", "start", ["a"]),
+            ("a", "map", ["b"]),
+            ("b", "decision", ["a", "stop"]),
+            ("stop", "stop", []),
+        ]
+        self.assertEqual(sequence(shapes), {"start": 1, "a": 2, "b": 3, "stop": 4})
+
+    def test_without_start_shape_unlinked_shapes_are_roots(self):
+        self.assertEqual(find_roots([[1], [], []], ["map", "map", "notify"]), [0, 2])
+        # Everything is linked: the first shape starts
+        self.assertEqual(find_roots([[1], [0]], ["map", "map"]), [0])
+
+    def test_long_chain_is_iterative(self):
+        count = 50000
+        shapes = [(f"s{i}", "start" if i == 0 else "map", [f"s{i + 1}"] if i + 1 < count else [])
+                  for i in range(count)]
+        result = sequence(shapes)
+        self.assertEqual(result["s0"], 1)
+        self.assertEqual(result[f"s{count - 1}"], count)
+
+
+if __name__ == "__main__":
+    unittest.main()
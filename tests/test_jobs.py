@@ -0,0 +1,44 @@
+import threading
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (import paths)
+
+import jobs
+from artifact_store import artifact_store
+
+
+class JobSaveTest(unittest.TestCase):
+    def test_progress_writes_are_throttled(self):
+        def work(job):
+            job.add_total(200)
+            threads = [threading.Thread(target=lambda start=start: [job.item_done(f"p{i}")
+                                                                     for i in range(start, start + 50)])
+                       for start in range(0, 200, 50)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return {"items": 200}
+
+        job = jobs.Job("test", "owner")
+        with mock.patch.object(jobs, "JOB_SAVE_INTERVAL", 60), \
+                mock.patch.object(jobs.artifact_store, "put", wraps=artifact_store.put) as put:
+            jobs._run(job, work, (), {})
+        # Only "running" and the final state; every progress update fell inside the interval
+        self.assertEqual(put.call_count, 2)
+        state = jobs.get_job_state(job.id, "owner")
+        self.assertEqual((state["status"], state["progress"]["done"]), ("done", 200))
+        self.assertEqual(state["result"], {"items": 200})
+
+    def test_stage_changes_are_always_written(self):
+        job = jobs.Job("test", "owner")
+        with mock.patch.object(jobs, "JOB_SAVE_INTERVAL", 60):
+            job.save(force=True)
+            with job.stage("export"):
+                self.assertEqual(jobs.get_job_state(job.id, "owner")["stages"][0]["name"], "export")
+        self.assertIsNotNone(jobs.get_job_state(job.id, "owner")["stages"][0]["seconds"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import io
+import os
+import re
+import time
+import unittest
+from unittest import mock
+
+from support import synthetic_csv
+
+import main
+from boomi_api import QueryError
+from artifact_store import artifact_store
+from evaluate import run_evaluation
+import evaluate
+
+
+class WebTest(unittest.TestCase):
+    def setUp(self):
+        main.app.config["TESTING"] = True
+        self.client = main.app.test_client()
+
+    def wait_for_job(self, job_id):
+        for _ in range(500):
+            state = self.client.get(f"/jobs/{job_id}").get_json()
+            if state["status"] in ("done", "failed"):
+                return state
+            time.sleep(0.01)
+        self.fail(f"job {job_id} did not finish")
+
+    def job_id(self, response):
+        match = re.search(r'const jobId = "(\w+)"', response.get_data(as_text=True))
+        self.assertIsNotNone(match, "not a job status page")
+        return match.group(1)
+
+    def test_failed_catalog_page_is_shown(self):
+        def pages(username, password, acc_id):
+            yield {"result": [{"name": "Orders", "id": "p1"}]}
+            raise QueryError("Process query stopped after 1 pages: 500 down")
+
+        form = {"boomiaccountId": "acc", "boomiUsername": "user", "boomiPassword": "pw"}
+        with mock.patch.object(main, "iter_process_pages", pages):
+            for url in ("/extract", "/migrate"):
+                page = self.client.post(url, data=form).get_data(as_text=True)
+                self.assertIn('value="p1"', page)
+                self.assertIn("Only part of the process list could be retrieved", page)
+
+
+    def test_migrate_password_is_not_kept(self):
+        def run_migrate_job(job, username, password, acc_id, selected_processes, common_context):
+            self.assertEqual(password, "s3cret-pw")
+            return {"template": "migration.html", "context": dict(message="Migration Preview generated.",
+                                                                 **common_context)}
+
+        form = {"boomiaccountId": "acc", "boomiUsername": "user", "boomiPassword": "s3cret-pw",
+                "selected_processes": ["p1"]}
+        with mock.patch.object(main, "run_migrate_job", run_migrate_job):
+            response = self.client.post("/migrate", data=form)
+            job_id = self.job_id(response)
+            self.assertEqual(self.wait_for_job(job_id)["status"], "done")
+
+        self.assertNotIn("s3cret-pw", response.headers.get("Set-Cookie", ""))
+        with self.client.session_transaction() as session:
+            self.assertNotIn("boomiPassword", session)
+        with open(os.path.join(artifact_store.directory, f"job-{job_id}.data"), encoding="utf-8") as f:
+            self.assertNotIn("s3cret-pw", f.read())
+        page = self.client.get(f"/jobs/{job_id}/result").get_data(as_text=True)
+        self.assertIn('value="user"', page)
+        self.assertNotIn("s3cret-pw", page)
+
+    def test_evaluate_job_tables(self):
+        csv_text = synthetic_csv(15, 12, seed=11)
+        expected = run_evaluation(csv_text)
+        job_id = self.job_id(self.client.post("/evaluate", data={"csv_data": csv_text}))
+        self.assertEqual(self.wait_for_job(job_id)["status"], "done")
+        context = artifact_store.get(f"job-{job_id}")["result"]["context"]
+
+        full_csv = self.client.get(context["full_csv_url"]).get_data(as_text=True)
+        lines = full_csv.split("\n")
+        self.assertEqual(lines[0], ",".join(expected["full_header"]))
+        self.assertEqual(lines[1:-1], [",".join(row) for row in expected["full_rows"]])
+
+        page = self.client.get(context["full_evaluation"] + "?page=2&per_page=10&sort=0").get_json()
+        self.assertEqual(page["total"], len(expected["full_rows"]))
+        self.assertEqual(len(page["rows"]), 10)
+
+        zip_response = self.client.get(context["zip_url"])
+        self.assertEqual(zip_response.status_code, 200)
+        self.assertEqual(zip_response.get_data()[:2], b"PK")
+
+    def evaluate_upload(self, data):
+        response = self.client.post("/evaluate", data={"csvfile": (io.BytesIO(data), "metadata.csv")},
+                                    content_type="multipart/form-data")
+        job_id = self.job_id(response)
+        self.assertEqual(self.wait_for_job(job_id)["status"], "done")
+        return artifact_store.get(f"job-{job_id}")["result"]
+
+    def test_evaluate_upload(self):
+        csv_text = synthetic_csv(15, 12, seed=12)
+        expected = run_evaluation(csv_text)
+        result = self.evaluate_upload(csv_text.encode("utf-8"))
+        full_csv = self.client.get(result["context"]["full_csv_url"]).get_data(as_text=True)
+        self.assertEqual(full_csv.split("\n")[1:-1], [",".join(row) for row in expected["full_rows"]])
+
+    def test_overlong_upload_line_fails_the_evaluation(self):
+        csv_text = synthetic_csv(2, 5, seed=13)
+        with mock.patch.object(evaluate, "MAX_CSV_LINE_BYTES", 1024):
+            result = self.evaluate_upload((csv_text + "x," * 2000 + "\n").encode("utf-8"))
+        self.assertEqual(result["template"], "evaluate_form.html")
+        self.assertIn("longer than", result["context"]["message"])
+
+    def test_other_sessions_cannot_download(self):
+        with self.client.session_transaction() as session:
+            session["sid"] = "someone"
+        table_id = main.store_table(["a"], [["1"]], "t.csv", "someone")
+        self.assertEqual(self.client.get(f"/download/{table_id}").status_code, 200)
+        other = main.app.test_client()
+        self.assertEqual(other.get(f"/download/{table_id}").status_code, 404)
+        self.assertEqual(other.get(f"/api/table/{table_id}").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import io
+import zipfile
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (import paths)
+
+import category_rules as category_rules_module
+from category_rules import RuleSet, DEFAULT_RULES
+from synthetic import synthetic_component
+from evaluation_memo import ComponentMemo
+from component_pipeline import parse_component, parsed_size, metadata_view, migration_view
+from migration import iflow_plans
+from iflow_skeleton import build_iflow, iter_iflows, iter_iflow_zip, _manifest
+import connector_details as connector_details_module
+from connector_details import connector_refs, connector_details
+
+EXPORT = (
+    '<bns:Component xmlns:bns="http://api.platform.boomi.com/" componentId="proc-1" version="3" name="Orders">'
+    '<bns:object><process><shapes>'
+    '<shape name="shape3" shapetype="stop" userlabel=""><configuration><stop continue="true"/></configuration>'
+    '<dragpoints/></shape>'
+    '<shape name="shape1" shapetype="start" userlabel="">'
+    '<configuration><connectoraction actionType="Listen" connectorType="sftp" connectionId="conn-1" '
+    'operationId="op-1"/></configuration>'
+    '<dragpoints><dragpoint name="shape1.dragpoint1" toShape="shape2"/></dragpoints></shape>'
+    '<shape name="shape2" shapetype="map" userlabel="Map orders"><configuration><map mapId="m1"/></configuration>'
+    '<dragpoints><dragpoint name="shape2.dragpoint1" toShape="shape3"/></dragpoints></shape>'
+    '<shape name="shape4" shapetype="notify" userlabel="Orphan"><configuration/><dragpoints/></shape>'
+    '</shapes></process></bns:object></bns:Component>'
+)
+
+
+class AlternativeRegistryTest(unittest.TestCase):
+    def test_lookups_ignore_case_and_spaces(self):
+        rules = RuleSet(DEFAULT_RULES)
+        self.assertEqual(rules.alternative("map"), rules.alternative(" M a P "))
+        self.assertEqual(rules.alternative("no such shape"), "NA")
+
+    def test_added_rule_is_seen_by_cached_lookups(self):
+        rules = RuleSet(DEFAULT_RULES)
+        self.assertEqual(rules.alternative("customThing"), "NA")
+        rules.add_shape_rule("Custom Thing", "Adapt", alternative="groovyScript")
+        self.assertEqual(rules.alternatives_for(["customthing", "customThing"]), ["groovyScript"] * 2)
+
+    def test_connector_shapes_map_by_connector_type(self):
+        rules = RuleSet(DEFAULT_RULES)
+        alternatives = rules.shape_alternatives([
+            ("connectoraction", "connectoraction:{@connectorType: sftp, @actionType: Get}"),
+            ("start", "connectoraction:{@connectorType: unknownconnector}"),
+            ("map", ""),
+        ])
+        self.assertEqual(alternatives, [rules.alternative("sftp"), rules.alternative("start"), rules.alternative("map")])
+
+    def test_only_known_names_are_remembered(self):
+        rules = RuleSet(DEFAULT_RULES)
+        self.assertEqual(rules.alternatives_for(["map", "MAP", "nope", "nope", "other"]),
+                         [rules.alternative("map")] * 2 + ["NA"] * 3)
+        self.assertEqual(set(rules._resolved), {"map", "MAP"})
+
+    def test_remembered_names_are_bounded(self):
+        rules = RuleSet(DEFAULT_RULES)
+        with mock.patch.object(category_rules_module, "RESOLVED_NAMES_MAX", 3):
+            names = ["map", "Map", "MAP", "m ap", "ma p"]
+            self.assertEqual(rules.alternatives_for(names), [rules.alternative("map")] * 5)
+        self.assertEqual(len(rules._resolved), 3)
+
+
+class ComponentPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.parsed = parse_component("proc-1", EXPORT, version="3")
+
+    def test_rows_labels_and_sequence(self):
+        self.assertEqual([row.shape_type for row in self.parsed.rows], ["stop", "start", "map", "notify"])
+        self.assertEqual(self.parsed.labels, ["Orders", "Orders", "Map orders", "Orphan"])
+        self.assertEqual(self.parsed.sequence, [3, 1, 2, None])
+        self.assertEqual(metadata_view([self.parsed]), self.parsed.rows)
+
+    def test_migration_view(self):
+        rows = migration_view([self.parsed, self.parsed])
+        self.assertEqual([row.step_no for row in rows], [1, 2, 3, 4, 1, 2, 3, 4])
+        self.assertEqual([row.revised_sequence for row in rows[:4]], [3, 1, 2, ""])
+        self.assertEqual(rows[3].status, "Unreachable")
+        self.assertEqual(rows[2].status, "Mapped")
+
+
+class ParsedComponentCacheTest(unittest.TestCase):
+    def test_bounded_by_size(self):
+        parsed = parse_component("proc-1", EXPORT, version="3")
+        size = parsed_size(parsed)
+        cache = ComponentMemo(100, max_bytes=size * 2, sizeof=parsed_size)
+        for version in range(3):
+            cache.put(("acc", "proc-1", version), parsed)
+        self.assertEqual(cache.bytes, size * 2)
+        self.assertIsNone(cache.get(("acc", "proc-1", 0)))
+        self.assertIs(cache.get(("acc", "proc-1", 2)), parsed)
+
+    def test_entry_larger_than_the_cache_is_not_kept(self):
+        parsed = parse_component("proc-1", EXPORT, version="3")
+        cache = ComponentMemo(100, max_bytes=parsed_size(parsed) - 1, sizeof=parsed_size)
+        cache.put("key", parsed)
+        self.assertEqual((cache.get("key"), cache.bytes), (None, 0))
+
+    def test_replaced_entry_is_counted_once(self):
+        cache = ComponentMemo(100, max_bytes=100, sizeof=len)
+        cache.put("key", "x" * 60)
+        cache.put("key", "y" * 30)
+        self.assertEqual(cache.bytes, 30)
+
+
+class IflowSkeletonTest(unittest.TestCase):
+    def plans(self, count):
+        components = [parse_component(f"id-{i}", synthetic_component(f"id-{i}", f"Process {i}", 15))
+                      for i in range(count)]
+        return iflow_plans(components)
+
+    def test_skeleton_project(self):
+        plan = self.plans(1)[0]
+        file_name, data = build_iflow(plan)
+        with zipfile.ZipFile(io.BytesIO(data)) as project:
+            names = project.namelist()
+            iflw = project.read(next(name for name in names if name.endswith(".iflw"))).decode("utf-8")
+        self.assertTrue(file_name.startswith("Process_0_") and file_name.endswith(".zip"))
+        self.assertIn("META-INF/MANIFEST.MF", names)
+        self.assertEqual(iflw.count("<bpmn2:callActivity "), len(plan["steps"]))
+
+    def test_workers_build_the_same_projects(self):
+        plans = self.plans(6)
+        inline = dict(iter_iflows(plans, workers=1))
+        pooled = dict(iter_iflows(plans, workers=2))
+        self.assertEqual(sorted(inline), sorted(pooled))
+        for name, data in inline.items():
+            with zipfile.ZipFile(io.BytesIO(data)) as a, zipfile.ZipFile(io.BytesIO(pooled[name])) as b:
+                self.assertEqual({n: a.read(n) for n in a.namelist()}, {n: b.read(n) for n in b.namelist()})
+
+    def test_streamed_zip(self):
+        plans = self.plans(3)
+        data = b"".join(iter_iflow_zip(plans, workers=1))
+        with zipfile.ZipFile(io.BytesIO(data)) as bundle:
+            self.assertEqual(len(bundle.namelist()), 3)
+            self.assertIsNone(bundle.testzip())
+
+    def test_manifest_lines_are_wrapped(self):
+        name = "Orders \u00e9t\u00e9\r\nBundle-Name: other " + "\u00e9" * 80
+        manifest = _manifest("Orders_" + "x" * 80, name)
+        lines = manifest.split("\r\n")
+        self.assertEqual(lines[-1], "")
+        self.assertTrue(all(len(line.encode("utf-8")) <= 72 for line in lines))
+        self.assertEqual(sum(line.startswith("Bundle-Name:") for line in lines), 1)
+        unfolded = manifest.replace("\r\n ", "")
+        self.assertIn("Origin-Bundle-Name: Orders \u00e9t\u00e9 Bundle-Name: other " + "\u00e9" * 80 + "\r\n",
+                      unfolded)
+        self.assertIn("Bundle-SymbolicName: Orders_" + "x" * 80 + "; singleton:=true\r\n", unfolded)
+
+
+class ConnectorDetailsTest(unittest.TestCase):
+    def test_each_reference_resolved_once(self):
+        parsed = parse_component("proc-1", EXPORT)
+        refs = connector_refs([parsed, parsed])
+        self.assertEqual(len(refs), 2)
+        self.assertEqual(refs[0][3:], ("sftp", "Listen", "conn-1", "op-1"))
+
+        resolved = {"conn-1": {"name": "SFTP Server"}, "op-1": {"name": "Read orders"}}
+        with mock.patch.object(connector_details_module, "get_components_bulk", return_value=resolved) as bulk:
+            rows = connector_details("u", "p", "acc", [parsed, parsed])
+        bulk.assert_called_once_with("u", "p", "acc", ["conn-1", "op-1"])
+        self.assertEqual(rows[0], ["Orders", "2", "Orders", "sftp", "Listen", "conn-1", "SFTP Server", "op-1",
+                                   "Read orders"])
+
+
+
+if __name__ == "__main__":
+    unittest.main()
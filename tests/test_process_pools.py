@@ -0,0 +1,42 @@
+import unittest
+
+import support  # noqa: F401  (import paths)
+
+import process_pools
+from process_pools import spawn_pool
+
+
+class SpawnPoolTest(unittest.TestCase):
+    def tearDown(self):
+        for pool in process_pools._pools.values():
+            pool.executor.shutdown()
+        process_pools._pools.clear()
+
+    def test_reused_for_the_same_size(self):
+        with spawn_pool("test", 1) as first:
+            pass
+        with spawn_pool("test", 1) as second:
+            self.assertIs(first, second)
+            self.assertEqual(second.submit(pow, 2, 10).result(), 1024)
+
+    def test_replaced_pool_stays_usable_until_released(self):
+        with spawn_pool("test", 1) as old:
+            with spawn_pool("test", 2) as new:
+                self.assertIsNot(old, new)
+                self.assertEqual(new.submit(pow, 3, 2).result(), 9)
+            # The lease on the old pool is still held, so it still takes work
+            self.assertEqual(old.submit(pow, 2, 3).result(), 8)
+        with self.assertRaises(RuntimeError):
+            old.submit(pow, 2, 3)
+        self.assertEqual(process_pools._pools["test"].workers, 2)
+
+    def test_unused_pool_is_shut_down_when_replaced(self):
+        with spawn_pool("test", 1) as old:
+            pass
+        with spawn_pool("test", 2):
+            with self.assertRaises(RuntimeError):
+                old.submit(pow, 2, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
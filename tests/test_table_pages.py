@@ -0,0 +1,70 @@
+import os
+import shutil
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import support  # noqa: F401  (import paths)
+
+from artifact_store import ArtifactStore
+from table_pages import TableView, _sort_key
+
+
+class TableViewTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        rng = random.Random(1)
+        cls.rows = [[str(i), rng.choice(["Map", "notify", "Branch"]) + str(rng.randint(0, 40)), str(rng.random())]
+                    for i in range(2345)]
+        store = ArtifactStore(os.path.join(cls.directory, "store"))
+        with store.table_writer("me", ["id", "label", "score"], chunk_rows=100) as writer:
+            writer.extend(cls.rows)
+            cls.table = store.table(writer.close(), "me")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_unsorted_pages(self):
+        view = TableView(self.table)
+        page = view.page(page=3, per_page=100)
+        self.assertEqual(page["rows"], self.rows[200:300])
+        self.assertEqual((page["pages"], page["total"], page["matched"]), (24, 2345, 2345))
+        last = view.page(page=99, per_page=100)
+        self.assertEqual((last["page"], last["rows"]), (24, self.rows[2300:]))
+
+    def test_sort_and_filter_match_in_memory(self):
+        view = TableView(self.table)
+        for sort in (0, 1, 2):
+            for descending in (False, True):
+                for query in ("", "map1"):
+                    expected = [row for row in self.rows if query in "\x1f".join(row).lower()]
+                    expected.sort(key=lambda row: _sort_key(row[sort]), reverse=descending)
+                    page = view.page(page=2, per_page=37, sort=sort, descending=descending, query=query)
+                    self.assertEqual(page["matched"], len(expected))
+                    self.assertEqual(page["rows"], expected[37:74], (sort, descending, query))
+
+    def test_each_chunk_read_once_per_page(self):
+        view = TableView(self.table)
+        order = view._order(2, False, "")
+        chunks = {self.table.locate(i)[0] for i in order[:50]}
+        with mock.patch.object(self.table, "chunk", wraps=self.table.chunk) as chunk:
+            view.page(per_page=50, sort=2)
+        self.assertEqual(chunk.call_count, len(chunks))
+
+    def test_numbers_sort_numerically(self):
+        page = TableView(self.table).page(per_page=3, sort=0, descending=True)
+        self.assertEqual([row[0] for row in page["rows"]], ["2344", "2343", "2342"])
+
+    def test_out_of_range_arguments(self):
+        view = TableView(self.table)
+        page = view.page(page=-5, per_page=100000, sort=17)
+        self.assertEqual((page["page"], page["per_page"]), (1, 500))
+        self.assertEqual(page["rows"], self.rows[:500])
+        self.assertEqual(view.page(query="no such text")["rows"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()